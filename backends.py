@@ -0,0 +1,235 @@
+import random
+import sys
+from time import perf_counter, sleep
+
+from classes import GRID_COLUMNS, GRID_ROWS
+
+ITEM_FOOTPRINTS = [(1, 1), (1, 2), (1, 3), (1, 4), (2, 2), (2, 3), (2, 4)]
+
+
+class InputBackend:
+    def move_to(self, x: float, y: float) -> None:
+        raise NotImplementedError
+
+    def copy(self) -> None:
+        raise NotImplementedError
+
+    def read_clipboard(self) -> str:
+        raise NotImplementedError
+
+    def write_clipboard(self, text: str) -> None:
+        raise NotImplementedError
+
+    def clipboard_sequence(self) -> int:
+        return None
+
+    def screenshot(self, region: tuple):
+        raise NotImplementedError
+
+    def foreground_window_title(self) -> str:
+        return None
+
+    def set_move_delay(self, delay: float) -> None:
+        pass
+
+    def add_hotkey(self, key: str, callback):
+        raise NotImplementedError
+
+    def remove_hotkey(self, handle) -> None:
+        raise NotImplementedError
+
+
+class DesktopBackend(InputBackend):
+    def __init__(self) -> None:
+        import keyboard
+        import pyautogui
+        import pyperclip
+
+        self.keyboard = keyboard
+        self.pyautogui = pyautogui
+        self.pyperclip = pyperclip
+        self.win32 = sys.platform == "win32"
+
+    def move_to(self, x: float, y: float) -> None:
+        self.pyautogui.moveTo(x, y)
+
+    def copy(self) -> None:
+        self.keyboard.press_and_release("ctrl+c")
+
+    def read_clipboard(self) -> str:
+        return self.pyperclip.paste()
+
+    def write_clipboard(self, text: str) -> None:
+        self.pyperclip.copy(text)
+
+    def clipboard_sequence(self) -> int:
+        if not self.win32:
+            return None
+        from win32clipboard import GetClipboardSequenceNumber
+
+        return GetClipboardSequenceNumber()
+
+    def screenshot(self, region: tuple):
+        import numpy as np
+
+        return np.asarray(self.pyautogui.screenshot(region=region))
+
+    def foreground_window_title(self) -> str:
+        if not self.win32:
+            return None
+        from win32gui import GetForegroundWindow, GetWindowText
+
+        return GetWindowText(GetForegroundWindow())
+
+    def set_move_delay(self, delay: float) -> None:
+        self.pyautogui.PAUSE = delay
+
+    def add_hotkey(self, key: str, callback):
+        return self.keyboard.add_hotkey(key, callback)
+
+    def remove_hotkey(self, handle) -> None:
+        self.keyboard.remove_hotkey(handle)
+
+
+class SimulatedShop(InputBackend):
+    def __init__(
+        self,
+        grid: list,
+        items: dict,
+        move_latency: float = 0.0,
+        copy_latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        window_title: str = "Path of Exile",
+        seed: int = 0,
+    ) -> None:
+        self.grid = grid
+        self.items = items
+        self.move_latency = move_latency
+        self.copy_latency = copy_latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.window_title = window_title
+        self.rng = random.Random(seed)
+        self.cursor = None
+        self.footprints = {}
+        self.clipboard = ""
+        self.sequence = 0
+        self.pending = None
+        self.hotkeys = {}
+        self.moves = 0
+        self.copies = 0
+
+    @classmethod
+    def random_shop(
+        cls, grid: list, texts: list, fill: float = 0.5, seed: int = 0, **kwargs
+    ) -> "SimulatedShop":
+        rng = random.Random(seed)
+        free = [[True] * GRID_COLUMNS for _ in range(GRID_ROWS)]
+        items = {}
+        footprints = {}
+        target = int(fill * GRID_COLUMNS * GRID_ROWS)
+        occupied = 0
+        for _ in range(GRID_COLUMNS * GRID_ROWS * 4):
+            if occupied >= target:
+                break
+            width, height = rng.choice(ITEM_FOOTPRINTS)
+            col = rng.randrange(GRID_COLUMNS - width + 1)
+            row = rng.randrange(GRID_ROWS - height + 1)
+            cells = [
+                (row + dy, col + dx) for dy in range(height) for dx in range(width)
+            ]
+            if not all(free[r][c] for r, c in cells):
+                continue
+            text = rng.choice(texts)
+            for r, c in cells:
+                free[r][c] = False
+                items[r * GRID_COLUMNS + c] = text
+            footprints[row * GRID_COLUMNS + col] = (width, height)
+            occupied += len(cells)
+        shop = cls(grid=grid, items=items, seed=seed, **kwargs)
+        shop.footprints = footprints
+        return shop
+
+    def delay(self, latency: float) -> float:
+        if self.latency_jitter:
+            latency += self.rng.uniform(0, self.latency_jitter)
+        return latency
+
+    def move_to(self, x: float, y: float) -> None:
+        self.moves += 1
+        self.cursor = min(
+            range(len(self.grid)),
+            key=lambda i: (self.grid[i][0] - x) ** 2 + (self.grid[i][1] - y) ** 2,
+        )
+        if self.move_latency:
+            sleep(self.delay(self.move_latency))
+
+    def copy(self) -> None:
+        self.copies += 1
+        self.settle()
+        text = self.items.get(self.cursor)
+        if text is None or self.rng.random() < self.failure_rate:
+            return
+        self.pending = (perf_counter() + self.delay(self.copy_latency), text)
+        self.settle()
+
+    def settle(self) -> None:
+        if self.pending is not None and perf_counter() >= self.pending[0]:
+            self.clipboard = self.pending[1]
+            self.sequence += 1
+            self.pending = None
+
+    def read_clipboard(self) -> str:
+        self.settle()
+        return self.clipboard
+
+    def write_clipboard(self, text: str) -> None:
+        self.pending = None
+        self.clipboard = text
+        self.sequence += 1
+
+    def clipboard_sequence(self) -> int:
+        self.settle()
+        return self.sequence
+
+    def screenshot(self, region: tuple):
+        import numpy as np
+
+        rng = np.random.default_rng(self.rng.randrange(2 ** 32))
+        width, height = int(region[2]), int(region[3])
+        cell_width = width / GRID_COLUMNS
+        cell_height = height / GRID_ROWS
+        image = np.full((height, width, 3), 18, dtype="uint8")
+        for col in range(1, GRID_COLUMNS):
+            x = int(col * cell_width)
+            image[:, max(x - 1, 0) : x + 2] = 60
+        for row in range(1, GRID_ROWS):
+            y = int(row * cell_height)
+            image[max(y - 1, 0) : y + 2, :] = 60
+        for cell, (item_width, item_height) in self.footprints.items():
+            row, col = divmod(cell, GRID_COLUMNS)
+            top = int(row * cell_height) + 3
+            left = int(col * cell_width) + 3
+            bottom = int((row + item_height) * cell_height) - 3
+            right = int((col + item_width) * cell_width) - 3
+            image[top:bottom, left:right] = rng.integers(
+                0, 256, size=(bottom - top, right - left, 3), dtype="uint8"
+            )
+        return image
+
+    def foreground_window_title(self) -> str:
+        return self.window_title
+
+    def add_hotkey(self, key: str, callback):
+        handle = len(self.hotkeys)
+        self.hotkeys[handle] = (key, callback)
+        return handle
+
+    def remove_hotkey(self, handle) -> None:
+        self.hotkeys.pop(handle, None)
+
+    def press(self, key: str) -> None:
+        for hotkey, callback in list(self.hotkeys.values()):
+            if hotkey == key:
+                callback()
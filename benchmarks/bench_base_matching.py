@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import classes  # noqa: E402
+
+BASE_TYPES = [
+    "Vaal Regalia",
+    "Leather Belt",
+    "Heavy Belt",
+    "Gold Ring",
+    "Ruby Ring",
+    "Sapphire Ring",
+    "Two-Stone Ring",
+    "Onyx Amulet",
+    "Hubris Circlet",
+    "Titanium Spirit Shield",
+    "Imperial Claw",
+    "Cobalt Jewel",
+    "Vaal-Gewandung",
+    "Ceinture en cuir",
+    "Золотое кольцо",
+    "Amuleto de ónice",
+    "Joia de Cobalto",
+]
+LABELLED_NAMES = [
+    ("Vaal Regalia", "Vaal Regalia"),
+    ("vaal  regalia ", "Vaal Regalia"),
+    ("Superior Titanium Spirit Shield", "Titanium Spirit Shield"),
+    ("Seething Sapphire Ring of the Whelpling", "Sapphire Ring"),
+    ("Heavy Belt of the Lynx", "Heavy Belt"),
+    ("Glinting Two-Stone Ring", "Two-Stone Ring"),
+    ("Hochwertige Vaal-Gewandung", "Vaal-Gewandung"),
+    ("Ceinture en cuir de qualité", "Ceinture en cuir"),
+    ("ЗОЛОТОЕ КОЛЬЦО", "Золотое кольцо"),
+    ("Amuleto de ónice", "Amuleto de ónice"),
+    ("Joia de Cobalto", "Joia de Cobalto"),
+    ("Entropy Beads", None),
+]
+
+
+def main(repeat: int = 20000) -> None:
+    index = classes.BaseTypeIndex(BASE_TYPES)
+    correct = 0
+    for name, expected in LABELLED_NAMES:
+        base, candidates = index.resolve(name)
+        correct += base == expected
+        if base != expected:
+            print(f"mismatch: {name!r} -> {base!r} (candidates {candidates})")
+    print(f"accuracy: {correct}/{len(LABELLED_NAMES)}")
+    names = [name for name, _ in LABELLED_NAMES]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            index.resolve(name)
+    elapsed = time.perf_counter() - start
+    print(f"throughput: {repeat * len(names) / elapsed:.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
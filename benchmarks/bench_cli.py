@@ -0,0 +1,50 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import classes  # noqa: E402
+from corpus import ITEM_TEXTS  # noqa: E402
+from ninja_stub import NinjaStub  # noqa: E402
+
+
+def write_shops(path: str, count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    texts = list(ITEM_TEXTS.values())
+    with open(path, "w", encoding="utf-8") as f:
+        for shop in range(count):
+            items = [rng.choice(texts) for _ in range(rng.randint(20, 60))]
+            f.write(json.dumps({"shop": shop, "items": items}) + "\n")
+
+
+def main(shops: int = 20000) -> None:
+    os.chdir(tempfile.mkdtemp())
+    with NinjaStub() as stub:
+        classes.Prices(base_url=stub.url)
+    write_shops("shops.jsonl", shops)
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(ROOT, "cli.py"),
+                "shops.jsonl",
+                "-o",
+                "ranked.jsonl",
+                "-w",
+                str(workers),
+            ],
+            check=True,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers:<3} shops={shops} {shops / elapsed:.0f} shops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import backends  # noqa: E402
+import classes  # noqa: E402
+import logic  # noqa: E402
+from bench_scan import GRID  # noqa: E402
+from corpus import ITEM_TEXTS  # noqa: E402
+
+REGION = (0, 0, 600, 550)
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def expected_items(shop: backends.SimulatedShop) -> list:
+    items = []
+    for cell, (width, height) in shop.footprints.items():
+        items.append(
+            sorted(
+                cell + dy * classes.GRID_COLUMNS + dx
+                for dy in range(height)
+                for dx in range(width)
+            )
+        )
+    return sorted(items)
+
+
+def timed_scan(shop: backends.SimulatedShop, grid: list) -> tuple:
+    capture = logic.ClipboardCapture.from_backend(shop, timeout=0.05)
+    start = time.perf_counter()
+    records = logic.get_items(grid, backend=shop, capture=capture)
+    return time.perf_counter() - start, len(records)
+
+
+def render_shop(shop: backends.SimulatedShop, size: tuple, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    width, height = size
+    cell_width = width / classes.GRID_COLUMNS
+    cell_height = height / classes.GRID_ROWS
+    ys, xs = np.mgrid[0:height, 0:width].astype("float32")
+    image = (
+        14 + 6 * np.sin(xs / width * 3 + ys / height * 2) + rng.normal(0, 2.5, xs.shape)
+    )
+    for col in range(1, classes.GRID_COLUMNS):
+        image[:, int(col * cell_width)] = 38
+    for row in range(1, classes.GRID_ROWS):
+        image[int(row * cell_height), :] = 38
+    for cell, (item_width, item_height) in shop.footprints.items():
+        row, col = divmod(cell, classes.GRID_COLUMNS)
+        top, left = int(row * cell_height) + 2, int(col * cell_width) + 2
+        bottom = int((row + item_height) * cell_height) - 2
+        right = int((col + item_width) * cell_width) - 2
+        image[top:bottom, left:right] += 6
+        cy, cx = (top + bottom) / 2, (left + right) / 2
+        ry = (bottom - top) / 2 * rng.uniform(0.75, 0.95)
+        rx = (right - left) / 2 * rng.uniform(0.75, 0.95)
+        dist = ((ys - cy) / ry) ** 2 + ((xs - cx) / rx) ** 2
+        detail = rng.uniform(0.0, 1.0, xs.shape)
+        art = (dist < 1) * rng.uniform(40, 120) * detail
+        image[top:bottom, left:right] += art[top:bottom, left:right]
+    return np.clip(image, 0, 255).astype("uint8")
+
+
+def load_fixtures() -> list:
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.npz"))):
+        with open(path[:-4] + ".json", "r") as f:
+            meta = json.load(f)
+        with np.load(path) as data:
+            fixtures.append((os.path.basename(path)[:-4], data["image"], meta))
+    return fixtures
+
+
+def check_fixture(found: list, items: list) -> list:
+    owner = {cell: i for i, cells in enumerate(items) for cell in cells}
+    hovered = [0] * len(items)
+    errors = []
+    for cells in found:
+        owners = {owner.get(cell) for cell in cells}
+        if None in owners:
+            errors.append(f"empty cell detected in {cells}")
+        if len(owners - {None}) > 1:
+            errors.append(f"items merged in {cells}")
+        for i in owners - {None}:
+            hovered[i] += 1
+    for i, count in enumerate(hovered):
+        if count != 1:
+            errors.append(f"item {items[i]} hovered {count} times")
+    return errors
+
+
+def check_fixtures(threshold: float) -> int:
+    failures = 0
+    for name, image, meta in load_fixtures():
+        found = classes.TradingWindow.find_items(image, threshold)
+        errors = check_fixture(found, meta["items"])
+        failures += bool(errors)
+        status = "ok" if not errors else "FAIL"
+        print(f"{name} ({meta['source']}): {status}, {len(found)} hovers")
+        for error in errors:
+            print(f"  {error}")
+    return failures
+
+
+def save_fixture(name: str, image: np.ndarray, items: list, source: str) -> None:
+    os.makedirs(FIXTURES, exist_ok=True)
+    np.savez_compressed(os.path.join(FIXTURES, f"{name}.npz"), image=image)
+    with open(os.path.join(FIXTURES, f"{name}.json"), "w") as f:
+        json.dump({"source": source, "items": items}, f, indent=1)
+
+
+def capture_fixture(name: str, threshold: float) -> None:
+    trading_window = classes.TradingWindow()
+    image = backends.DesktopBackend().screenshot(trading_window.get_region())
+    items = classes.TradingWindow.find_items(image, threshold)
+    save_fixture(name, image, items, "capture")
+    print(f"saved {name} with {len(items)} detected items, correct the .json by hand")
+
+
+def make_synthetic(size: tuple = (633, 579)) -> None:
+    for seed, fill in enumerate([0.3, 0.6, 0.9]):
+        shop = backends.SimulatedShop.random_shop(
+            GRID, list(ITEM_TEXTS.values()), fill=fill, seed=100 + seed
+        )
+        image = render_shop(shop, size, seed)
+        save_fixture(f"synthetic_{seed}", image, expected_items(shop), "synthetic")
+
+
+def main(threshold: float = 12.0, seeds: int = 5) -> int:
+    for fill in [0.2, 0.5, 0.8]:
+        exact = hovers = full_time = skip_time = detect_time = 0
+        for seed in range(seeds):
+            shop = backends.SimulatedShop.random_shop(
+                GRID, list(ITEM_TEXTS.values()), fill=fill, seed=seed
+            )
+            image = shop.screenshot(REGION)
+            start = time.perf_counter()
+            found = classes.TradingWindow.find_items(image, threshold)
+            detect_time += time.perf_counter() - start
+            exact += found == expected_items(shop)
+            grid = [GRID[cells[0]] for cells in found]
+            hovers += len(grid)
+            full_time += timed_scan(shop, GRID)[0]
+            skip_time += timed_scan(shop, grid)[0]
+        print(
+            f"fill={fill}: exact footprints {exact}/{seeds}, "
+            f"hovers {hovers / seeds:.0f}/{len(GRID)}, "
+            f"detect {detect_time / seeds * 1000:.2f}ms, "
+            f"scan {full_time / seeds * 1000:.0f}ms -> {skip_time / seeds * 1000:.0f}ms"
+        )
+    return int(check_fixtures(threshold) > 0)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["capture"]:
+        capture_fixture(
+            sys.argv[2],
+            float(classes.Config.shared()["Base"].get("EmptyCellThreshold")),
+        )
+    elif sys.argv[1:2] == ["synthetic"]:
+        make_synthetic()
+    else:
+        sys.exit(main(*[float(arg) for arg in sys.argv[1:2]]))
@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import ev  # noqa: E402
+from bench_scan_engine import make_index  # noqa: E402
+from ninja_stub import BASE_TYPES  # noqa: E402
+
+
+def make_queries(count: int, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    bases = [rng.choice(BASE_TYPES) for _ in range(count)]
+    levels = np.array([rng.randint(40, 86) for _ in range(count)], dtype="float64")
+    return bases, levels
+
+
+def main() -> None:
+    index = make_index()
+    prices = index.visible(index.prices)
+    for monte_carlo in [False, True]:
+        model = ev.EVModel(
+            prices, unique_chance=0.3, cost=5.0, monte_carlo=monte_carlo, samples=2000
+        )
+        for count in [1, 132, 1000]:
+            bases, levels = make_queries(count)
+            start = time.perf_counter()
+            summary = model.summary(bases, levels)
+            elapsed = time.perf_counter() - start
+            mode = "montecarlo" if monte_carlo else "exact"
+            print(
+                f"{mode:<10} queries={count:<5} time={elapsed * 1000:.2f}ms "
+                f"mean_ev={summary['EV'].mean():.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from requests import RequestException, get  # noqa: E402
+
+import classes  # noqa: E402
+from ninja_stub import NinjaStub  # noqa: E402
+
+
+def sequential_fetch(url: str) -> None:
+    frames = []
+    for cat in classes.PRICE_CATEGORIES:
+        req = get(url, params={"league": "Standard", "type": cat, "language": "en"})
+        frames.append(pd.DataFrame.from_records(req.json()["lines"]))
+    pd.concat(frames, ignore_index=True).to_json("prices.json")
+
+
+def pooled_cold(url: str):
+    return lambda: classes.Prices(base_url=url, cache=classes.PriceCache(ttl=0))
+
+
+def pooled_refresh(url: str, ttl: float):
+    return classes.Prices(base_url=url, cache=classes.PriceCache(ttl=ttl)).fetch_prices
+
+
+def main(latency: float = 0.2, failure_rate: float = 0.0) -> None:
+    os.chdir(tempfile.mkdtemp())
+    runs = [
+        ("sequential", lambda url: lambda: sequential_fetch(url)),
+        ("pooled cold", pooled_cold),
+        ("pooled 304", lambda url: pooled_refresh(url, ttl=0)),
+        ("pooled ttl", lambda url: pooled_refresh(url, ttl=3600)),
+    ]
+    with NinjaStub(latency=latency, failure_rate=failure_rate) as stub:
+        for name, setup in runs:
+            sent = len(stub.requests)
+            try:
+                func = setup(stub.url)
+                sent = len(stub.requests)
+                start = time.perf_counter()
+                func()
+                result = f"{time.perf_counter() - start:.3f}s"
+            except Exception as exc:
+                result = f"failed ({type(exc).__name__})"
+            print(
+                f"{name:<12} latency={latency}s failure_rate={failure_rate}: "
+                f"{result}, {len(stub.requests) - sent} requests"
+            )
+
+
+def check_retries(retries: int = 3) -> list:
+    errors = []
+    os.chdir(tempfile.mkdtemp())
+    with NinjaStub(fail_first=retries) as stub:
+        try:
+            prices = classes.Prices(base_url=stub.url, retries=retries)
+        except RequestException as exc:
+            return [f"{retries} failures per category not retried: {exc!r}"]
+        expected = len(classes.PRICE_CATEGORIES) * (retries + 1)
+        if len(stub.requests) != expected:
+            errors.append(f"sent {len(stub.requests)} requests, expected {expected}")
+        written = prices.store.read()
+        if len(written) != len(classes.PRICE_CATEGORIES) * stub.lines_per_category:
+            errors.append(f"stored {len(written)} rows after retries")
+    with NinjaStub(fail_first=retries + 1) as stub:
+        prices = classes.Prices(
+            base_url=stub.url, retries=retries, cache=classes.PriceCache(ttl=0)
+        )
+        version = prices.store.current_path()
+        try:
+            prices.fetch_prices()
+            errors.append("fetch_prices did not raise after retries ran out")
+        except RequestException:
+            pass
+        if prices.store.current_path() != version:
+            errors.append("failed fetch replaced the stored prices")
+        if not prices.store.read().equals(written):
+            errors.append("stored prices changed after a failed fetch")
+    return errors
+
+
+def check() -> int:
+    errors = check_retries()
+    for error in errors:
+        print(f"FAIL {error}")
+    print("retries ok" if not errors else "retries FAIL")
+    return int(bool(errors))
+
+
+if __name__ == "__main__":
+    main()
+    main(latency=0.05, failure_rate=0.3)
+    sys.exit(check())
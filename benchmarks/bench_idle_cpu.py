@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends  # noqa: E402
+import classes  # noqa: E402
+import logic  # noqa: E402
+from bench_scan_engine import make_index  # noqa: E402
+from corpus import ITEM_TEXTS  # noqa: E402
+
+
+def main(budget_percent: float = 1.0, idle_seconds: float = 2.0) -> int:
+    os.chdir(tempfile.mkdtemp())
+    events = []
+    shop = backends.SimulatedShop.random_shop(
+        classes.TradingWindow().get_grid(), list(ITEM_TEXTS.values()), fill=0.5
+    )
+    worker = logic.ScanWorker(
+        publish=lambda event, value: events.append((time.perf_counter(), event)),
+        backend=shop,
+        index=make_index(),
+    )
+    thread = Thread(target=worker.main, daemon=True)
+    thread.start()
+    while not events:
+        time.sleep(0.01)
+
+    cpu = time.process_time()
+    time.sleep(idle_seconds)
+    idle_cpu = (time.process_time() - cpu) / idle_seconds
+    print(
+        f"idle worker: {idle_cpu * 100:.2f}% of one core "
+        f"(budget {budget_percent:.1f}%)"
+    )
+
+    hotkey = classes.Config.shared()["Base"].get("Hotkey")
+    start = time.perf_counter()
+    shop.press(hotkey)
+    shop.press(hotkey)
+    while not worker.scanning.is_set():
+        time.sleep(0.001)
+    while worker.scanning.is_set():
+        time.sleep(0.001)
+    results = [t for t, event in events if event == logic.RESULTS_EVENT]
+    print(
+        f"scan: first row after {(results[0] - start) * 1000:.0f}ms, "
+        f"done after {(results[-1] - start) * 1000:.0f}ms, "
+        f"{len(results)} updates, debounced presses queued: {worker.requests.qsize()}"
+    )
+    worker.stop()
+    thread.join()
+    return int(idle_cpu * 100 > budget_percent)
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[float(arg) for arg in sys.argv[1:2]]))
@@ -0,0 +1,50 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED_MODULES = [
+    "pandas",
+    "numpy",
+    "requests",
+    "pyautogui",
+    "keyboard",
+    "pyperclip",
+    "loguru",
+    "win32gui",
+]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.splitlines()[-1])
+    return times
+
+
+def main(budget_ms: float = 400.0) -> int:
+    times = import_times("interface")
+    total = times.get("interface", 0.0)
+    eager = [name for name in DEFERRED_MODULES if name in times]
+    print(f"import interface: {total:.1f}ms (budget {budget_ms:.0f}ms)")
+    for name, elapsed in sorted(times.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {elapsed:8.1f}ms  {name}")
+    if eager:
+        print(f"imported eagerly: {', '.join(eager)}")
+    return int(total > budget_ms or bool(eager))
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[float(arg) for arg in sys.argv[1:2]]))
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+import classes  # noqa: E402
+from ninja_stub import make_lines  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_catalogue(path: str, lines_per_category: int) -> None:
+    df = pd.concat(
+        [
+            pd.DataFrame.from_records(make_lines(cat, lines_per_category))
+            for cat in classes.PRICE_CATEGORIES
+        ],
+        ignore_index=True,
+    )
+    df.to_json(os.path.join(path, "prices.json"))
+    classes.PriceStore(os.path.join(path, "prices")).write(df)
+
+
+def load(path: str, kind: str) -> None:
+    start = time.perf_counter()
+    if kind == "json":
+        df = pd.read_json(os.path.join(path, "prices.json"))
+    else:
+        df = classes.PriceStore(os.path.join(path, "prices")).read()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{kind:<6} rows={len(df)} load={elapsed * 1000:.1f}ms "
+        f"rss={peak_rss_mb():.1f}MB"
+    )
+
+
+def main() -> None:
+    for lines_per_category in [300, 3000]:
+        path = tempfile.mkdtemp()
+        write_catalogue(path, lines_per_category)
+        for kind in ["json", "store"]:
+            subprocess.run([sys.executable, __file__, path, kind], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        load(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,39 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import optimizer  # noqa: E402
+
+
+def make_shop(count: int, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(1.0, 1.5) - 3 for _ in range(count)]
+    costs = [rng.choice([5, 10, 15, 20, 30, 50]) for _ in range(count)]
+    return values, costs
+
+
+def main() -> None:
+    for count, budget in [(132, 300), (132, 1000), (1000, 2000), (5000, 5000)]:
+        values, costs = make_shop(count)
+        timings = {}
+        totals = {}
+        for name, solve in [
+            ("exact", optimizer.solve_exact),
+            ("greedy", optimizer.solve_greedy),
+        ]:
+            start = time.perf_counter()
+            chosen = solve(values, costs, budget)
+            timings[name] = (time.perf_counter() - start) * 1000
+            totals[name] = sum(values[i] for i in chosen)
+        print(
+            f"items={count:<5} budget={budget:<5} "
+            f"exact={timings['exact']:.2f}ms ({totals['exact']:.1f}) "
+            f"greedy={timings['greedy']:.2f}ms ({totals['greedy']:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import classes  # noqa: E402
+from corpus import ITEM_TEXTS  # noqa: E402
+
+
+def legacy_parse(text: str) -> dict:
+    sections = text.split("--------")
+    section_1 = sections[0].split("\n")
+    properties = {"base": section_1[2].strip("\n \r")}
+    for line in text.split("\n"):
+        if ":" in line:
+            vals = line.split(":")
+            properties[vals[0].strip("\n \r")] = vals[1].strip("\n \r")
+    return properties
+
+
+def timed(func, texts: list, repeat: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(texts)
+    return len(texts) * repeat / (time.perf_counter() - start)
+
+
+def main() -> None:
+    texts = list(ITEM_TEXTS.values()) * 10
+    runs = [
+        ("legacy", lambda batch: [legacy_parse(text) for text in batch]),
+        ("Item", lambda batch: [classes.Item(text).properties for text in batch]),
+        ("parse_many", classes.Item.parse_many),
+    ]
+    for name, func in runs:
+        print(f"{name:<12} {timed(func, texts):>10.0f} items/s")
+    missing = [
+        name
+        for name, text in ITEM_TEXTS.items()
+        if "Item Level" not in legacy_parse(text)
+    ]
+    print(f"item level missed by legacy parser: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
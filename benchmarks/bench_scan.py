@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends  # noqa: E402
+import classes  # noqa: E402
+import logic  # noqa: E402
+from corpus import ITEM_TEXTS  # noqa: E402
+
+GRID = [
+    (10 + 50 * col, 10 + 50 * row)
+    for row in range(classes.GRID_ROWS)
+    for col in range(classes.GRID_COLUMNS)
+]
+SCENARIOS = [
+    {"fill": 0.3, "copy_latency": 0.0, "failure_rate": 0.0},
+    {"fill": 0.7, "copy_latency": 0.0, "failure_rate": 0.0},
+    {"fill": 0.7, "copy_latency": 0.005, "latency_jitter": 0.01, "failure_rate": 0.0},
+    {"fill": 0.7, "copy_latency": 0.005, "latency_jitter": 0.01, "failure_rate": 0.1},
+]
+
+
+def run(scenario: dict, timeout: float = 0.05, repeat: int = 3) -> None:
+    scenario = dict(scenario)
+    fill = scenario.pop("fill")
+    latencies = []
+    items = 0
+    for seed in range(repeat):
+        shop = backends.SimulatedShop.random_shop(
+            GRID, list(ITEM_TEXTS.values()), fill=fill, seed=seed, **scenario
+        )
+        capture = logic.ClipboardCapture.from_backend(shop, timeout=timeout)
+        start = time.perf_counter()
+        records = logic.get_items(GRID, backend=shop, capture=capture)
+        latencies.append(time.perf_counter() - start)
+        items += len(records)
+    total = sum(latencies)
+    print(
+        f"fill={fill} {scenario}: {items / total:.0f} items/s, "
+        f"scan {total / repeat * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    for scenario in SCENARIOS:
+        run(scenario)
@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import classes  # noqa: E402
+import logic  # noqa: E402
+from ninja_stub import BASE_TYPES, make_lines  # noqa: E402
+
+CFG = {
+    "Base": {"ScanEngine": "Python"},
+    "Prices": {"MinimumMeanChaosValue": "0.0", "SortBy": "Chaos Average"},
+}
+
+
+def make_index() -> classes.PriceIndex:
+    prices = pd.concat(
+        [
+            pd.DataFrame.from_records(make_lines(cat, 300))
+            for cat in classes.PRICE_CATEGORIES
+        ],
+        ignore_index=True,
+    )
+    prices["Items"] = 1
+    prices["Fated"] = False
+    prices["Blacklisted"] = False
+    return classes.PriceIndex(prices)
+
+
+def make_records(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    bases = BASE_TYPES + ["Unpriced Base"]
+    return [
+        {"base": rng.choice(bases), "Item Level": str(rng.randint(60, 86))}
+        for _ in range(count)
+    ]
+
+
+def timed(func, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    index = make_index()
+    for count in [20, 60, 132]:
+        records = make_records(count)
+        pandas_ms = timed(
+            lambda: logic.display_items(logic.items_frame(records), index, CFG)
+        )
+        python_ms = timed(lambda: logic.display_items_fast(records, index, CFG))
+        expected = logic.display_items(logic.items_frame(records), index, CFG)
+        actual = logic.display_items_fast(records, index, CFG)
+        identical = expected.dtypes.equals(actual.dtypes) and (
+            expected.to_string() == actual.to_string()
+        )
+        print(
+            f"items={count:<4} pandas={pandas_ms:.3f}ms python={python_ms:.3f}ms "
+            f"identical={identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
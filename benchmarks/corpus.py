@@ -0,0 +1,186 @@
+ITEM_TEXTS = {
+    "normal_body_armour": """Item Class: Body Armours
+Rarity: Normal
+Vaal Regalia
+--------
+Energy Shield: 175
+--------
+Requirements:
+Level: 68
+Int: 194
+--------
+Sockets: B-B B 
+--------
+Item Level: 84
+""",
+    "normal_belt": """Item Class: Belts
+Rarity: Normal
+Leather Belt
+--------
+Requirements:
+Level: 8
+--------
+Item Level: 75
+--------
++32 to maximum Life (implicit)
+""",
+    "normal_ring": """Item Class: Rings
+Rarity: Normal
+Gold Ring
+--------
+Requirements:
+Level: 20
+--------
+Item Level: 68
+--------
+9% increased Rarity of Items found (implicit)
+""",
+    "superior_shield": """Item Class: Shields
+Rarity: Normal
+Superior Titanium Spirit Shield
+--------
+Quality: +20% (augmented)
+Chance to Block: 24%
+Energy Shield: 138 (augmented)
+--------
+Requirements:
+Level: 68
+Int: 159
+--------
+Sockets: B-B-R 
+--------
+Item Level: 83
+--------
++10% to all Elemental Resistances (implicit)
+""",
+    "magic_ring": """Item Class: Rings
+Rarity: Magic
+Seething Sapphire Ring of the Whelpling
+--------
+Requirements:
+Level: 36
+--------
+Item Level: 81
+--------
++25% to Cold Resistance (implicit)
+--------
++21 to maximum Mana
++8% to Fire Resistance
+""",
+    "rare_amulet": """Item Class: Amulets
+Rarity: Rare
+Entropy Beads
+Onyx Amulet
+--------
+Requirements:
+Level: 60
+--------
+Item Level: 86
+--------
++12 to all Attributes (implicit)
+--------
++52 to maximum Life
++33% to Lightning Resistance
+Adds 4 to 9 Physical Damage to Attacks
+""",
+    "influenced_helmet": """Item Class: Helmets
+Rarity: Normal
+Hubris Circlet
+--------
+Energy Shield: 133
+--------
+Requirements:
+Level: 69
+Int: 154
+--------
+Sockets: B-B-G B 
+--------
+Item Level: 85
+--------
+Shaper Item
+""",
+    "corrupted_claw": """Item Class: Claws
+Rarity: Normal
+Imperial Claw
+--------
+Claw
+Physical Damage: 29-54
+Critical Strike Chance: 6.00%
+Attacks per Second: 1.60
+Weapon Range: 11
+--------
+Requirements:
+Level: 68
+Dex: 131
+Int: 95
+--------
+Sockets: G-B-G 
+--------
+Item Level: 84
+--------
+Grants 46 Life per Enemy Hit (implicit)
+--------
+Corrupted
+""",
+    "colon_in_value": """Item Class: Jewels
+Rarity: Normal
+Cobalt Jewel
+--------
+Item Level: 82
+--------
+Note: ~price 1 chaos: quick sale
+""",
+    "german_body_armour": """Gegenstandsklasse: Körperrüstungen
+Seltenheit: Normal
+Vaal-Gewandung
+--------
+Energieschild: 175
+--------
+Anforderungen:
+Stufe: 68
+Int: 194
+--------
+Fassungen: B-B 
+--------
+Gegenstandsstufe: 84
+""",
+    "french_belt": """Classe d'objet: Ceintures
+Rareté: Normal
+Ceinture en cuir
+--------
+Prérequis:
+Niveau: 8
+--------
+Niveau de l'objet: 75
+--------
++32 à la Vie maximale (implicit)
+""",
+    "russian_ring": """Класс предмета: Кольца
+Редкость: Обычный
+Золотое кольцо
+--------
+Требования:
+Уровень: 20
+--------
+Уровень предмета: 68
+--------
+9% повышение редкости найденных предметов (implicit)
+""",
+    "spanish_amulet": """Clase de objeto: Amuletos
+Rareza: Normal
+Amuleto de ónice
+--------
+Requisitos:
+Nivel: 60
+--------
+Nivel de Objeto: 86
+--------
++12 a todos los atributos (implicit)
+""",
+    "portuguese_jewel": """Classe do Item: Joias
+Raridade: Normal
+Joia de Cobalto
+--------
+Nível do Item: 82
+""",
+}
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+
+BASE_TYPES = [
+    "Vaal Regalia",
+    "Leather Belt",
+    "Gold Ring",
+    "Sapphire Ring",
+    "Onyx Amulet",
+    "Hubris Circlet",
+    "Titanium Spirit Shield",
+    "Imperial Claw",
+    "Cobalt Jewel",
+    "Crimson Jewel",
+]
+
+
+def make_lines(category: str, count: int, seed: int = 0) -> list:
+    rng = random.Random(f"{category}-{seed}")
+    lines = []
+    for i in range(count):
+        lines.append(
+            {
+                "id": i,
+                "name": f"{category} Unique {i}",
+                "baseType": rng.choice(BASE_TYPES),
+                "chaosValue": round(rng.lognormvariate(1.5, 1.5), 2),
+                "listingCount": rng.randint(1, 400),
+                "links": rng.choice([None, None, None, 5, 6]),
+                "levelRequired": rng.choice([None, 20, 45, 60, 68]),
+                "sparkline": {"data": [0, 1.5, 2.0], "totalChange": 2.0},
+                "explicitModifiers": [{"text": "+10 to Strength", "optional": False}],
+                "tradeInfo": [],
+            }
+        )
+    return lines
+
+
+class NinjaStub:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        lines_per_category: int = 300,
+        seed: int = 0,
+        fail_first: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.failures = {}
+        self.lines_per_category = lines_per_category
+        self.rng = random.Random(seed)
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/api/data/ItemOverview"
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                query = parse_qs(urlparse(self.path).query)
+                stub.requests.append(query)
+                time.sleep(stub.latency)
+                category = query.get("type", [""])[0]
+                failed = stub.failures.get(category, 0)
+                if failed < stub.fail_first or stub.rng.random() < stub.failure_rate:
+                    stub.failures[category] = failed + 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps(
+                    {"lines": make_lines(category, stub.lines_per_category)}
+                ).encode()
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "NinjaStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
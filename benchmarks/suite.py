@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from itertools import cycle
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+CASES = {}
+
+
+class Skipped(Exception):
+    pass
+
+
+def case(name: str):
+    def register(func):
+        CASES[name] = func
+        return func
+
+    return register
+
+
+def measure(func, repeat: int = 20, warmup: int = 1) -> float:
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@case("fetch")
+def bench_fetch() -> dict:
+    import classes
+    from ninja_stub import NinjaStub
+
+    results = {}
+    with NinjaStub(latency=0.02) as stub:
+        path = tempfile.mkdtemp()
+
+        def cold() -> None:
+            classes.Prices(
+                base_url=stub.url,
+                cache=classes.PriceCache(tempfile.mkdtemp(), ttl=0),
+                store=classes.PriceStore(tempfile.mkdtemp()),
+            )
+
+        results["cold_ms"] = measure(cold, repeat=5)
+        prices = classes.Prices(
+            base_url=stub.url,
+            cache=classes.PriceCache(os.path.join(path, "cache"), ttl=0),
+            store=classes.PriceStore(os.path.join(path, "prices")),
+        )
+        results["not_modified_ms"] = measure(prices.fetch_prices, repeat=5)
+        prices.cache.ttl = 3600
+        prices.fetch_prices()
+        results["fresh_ms"] = measure(prices.fetch_prices, repeat=5)
+    return results
+
+
+@case("load_prices")
+def bench_load_prices() -> dict:
+    import classes
+    from bench_load_prices import write_catalogue
+
+    results = {}
+    for label, lines_per_category in [("1x", 300), ("10x", 3000)]:
+        path = tempfile.mkdtemp()
+        write_catalogue(path, lines_per_category)
+        prices = classes.Prices(
+            cache=classes.PriceCache(os.path.join(path, "cache")),
+            store=classes.PriceStore(os.path.join(path, "prices")),
+        )
+        results[f"{label}_ms"] = measure(lambda: prices.load_prices(True), repeat=10)
+        results[f"{label}_index_ms"] = measure(
+            lambda: classes.PriceIndex(prices.load_prices(True)), repeat=10
+        )
+    return results
+
+
+@case("parse")
+def bench_parse() -> dict:
+    import classes
+    from corpus import ITEM_TEXTS
+
+    texts = list(ITEM_TEXTS.values()) * 100
+    elapsed = measure(lambda: classes.Item.parse_many(texts))
+    return {"per_1000_items_ms": elapsed * 1000 / len(texts)}
+
+
+@case("display_items")
+def bench_display_items() -> dict:
+    import logic
+    from bench_scan_engine import CFG, make_index, make_records
+
+    index = make_index()
+    results = {}
+    for label, count in [("sparse", 20), ("full", 132)]:
+        records = make_records(count)
+        results[f"{label}_pandas_ms"] = measure(
+            lambda: logic.display_items(logic.items_frame(records), index, CFG)
+        )
+        results[f"{label}_python_ms"] = measure(
+            lambda: logic.display_items_fast(records, index, CFG)
+        )
+    return results
+
+
+@case("ev")
+def bench_ev() -> dict:
+    import ev
+    from bench_ev import make_queries
+    from bench_scan_engine import make_index
+
+    index = make_index()
+    model = ev.EVModel(index.visible(index.prices), unique_chance=0.3, cost=5.0)
+    bases, levels = make_queries(132)
+    return {"exact_132_ms": measure(lambda: model.evaluate(bases, levels))}
+
+
+@case("optimizer")
+def bench_optimizer() -> dict:
+    import optimizer
+    from bench_optimizer import make_shop
+
+    values, costs = make_shop(1000)
+    return {
+        "exact_1000_ms": measure(lambda: optimizer.solve_exact(values, costs, 2000)),
+        "greedy_1000_ms": measure(lambda: optimizer.solve_greedy(values, costs, 2000)),
+    }
+
+
+@case("base_matching")
+def bench_base_matching() -> dict:
+    import classes
+    from bench_base_matching import BASE_TYPES, LABELLED_NAMES
+
+    index = classes.BaseTypeIndex(BASE_TYPES)
+    names = [name for name, _ in LABELLED_NAMES] * 100
+    elapsed = measure(lambda: [index.resolve(name) for name in names])
+    return {"per_1000_lookups_ms": elapsed * 1000 / len(names)}
+
+
+@case("render")
+def bench_render() -> dict:
+    try:
+        import PySimpleGUI as sg
+    except ImportError as exc:
+        raise Skipped(str(exc))
+    import interface
+    import logic
+
+    results = {}
+    table = sg.Table([[""] * len(logic.OUTPUT_COLUMNS)], logic.OUTPUT_COLUMNS, k="t")
+    try:
+        window = sg.Window("bench", [[table]], finalize=True)
+    except Exception as exc:
+        raise Skipped(f"no display: {exc}")
+    try:
+        for label, count in [("full", 132), ("large", 2000)]:
+            rows = [
+                [f"Base {i}", str(60 + i % 27), 10, 0.1, 5.0 + i, 100.0, 2.5]
+                for i in range(count)
+            ]
+            results[f"{label}_table_ms"] = measure(
+                lambda: window["t"].update(values=rows), repeat=10
+            )
+            changed = [list(row) for row in rows]
+            changed[0][6] = 3.5
+            frames = cycle([changed, rows])
+            results[f"{label}_diff_ms"] = measure(
+                lambda: interface.update_table(window["t"], next(frames)), repeat=10
+            )
+    finally:
+        window.close()
+    return results
+
+
+def run(selected: list = None) -> dict:
+    os.chdir(tempfile.mkdtemp())
+    results = {}
+    for name, func in CASES.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        try:
+            metrics = func()
+        except Skipped as exc:
+            print(f"{name:<16} skipped ({exc})")
+            continue
+        for metric, value in metrics.items():
+            results[f"{name}.{metric}"] = value
+            print(f"{name:<16} {metric:<24} {value:>10.3f}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.time(),
+        },
+        "results": results,
+    }
+
+
+def save(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"saved {len(report['results'])} results to {path}")
+
+
+def load(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    regressions = []
+    for key, base in sorted(baseline["results"].items()):
+        value = current["results"].get(key)
+        if value is None:
+            print(f"{key:<40} missing")
+            continue
+        ratio = value / base if base else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "faster"
+        print(f"{key:<40} {base:>10.3f} -> {value:>10.3f} ({ratio:>5.2f}x) {flag}")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Gwennen Gambler benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run benchmarks and save results")
+    run_parser.add_argument("-o", "--output", help="results file")
+    run_parser.add_argument("-k", "--select", nargs="*", help="only matching cases")
+    base_parser = commands.add_parser("baseline", help="run and save as baseline")
+    base_parser.add_argument("-k", "--select", nargs="*", help="only matching cases")
+    compare_parser = commands.add_parser("compare", help="compare with the baseline")
+    compare_parser.add_argument("--baseline", default=BASELINE)
+    compare_parser.add_argument("--current", help="results file instead of a new run")
+    compare_parser.add_argument("-t", "--threshold", type=float, default=0.25)
+    compare_parser.add_argument("-k", "--select", nargs="*", help="only matching cases")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        output = os.path.abspath(args.output) if args.output else None
+        report = run(args.select)
+        if output:
+            save(report, output)
+        return 0
+    if args.command == "baseline":
+        save(run(args.select), BASELINE)
+        return 0
+    baseline = load(os.path.abspath(args.baseline))
+    if args.current:
+        current = load(os.path.abspath(args.current))
+    else:
+        current = run(args.select)
+    if args.select:
+        baseline["results"] = {
+            key: value
+            for key, value in baseline["results"].items()
+            if any(pattern in key.split(".")[0] for pattern in args.select)
+        }
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
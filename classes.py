@@ -1,21 +1,87 @@
-import webbrowser
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
-from os import getcwd, listdir
+from os import getcwd, getpid, listdir, makedirs, replace
+from os.path import exists, isdir, join
+from shutil import rmtree
 from string import capwords
+from threading import Lock, get_ident
+from time import time
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from requests import Session
+
+POE_NINJA_URL = "https://poe.ninja/api/data/ItemOverview"
+PRICE_CATEGORIES = ["UniqueWeapon", "UniqueArmour", "UniqueAccessory", "UniqueJewel"]
+PRICE_COLUMNS = [
+    "name",
+    "baseType",
+    "chaosValue",
+    "listingCount",
+    "links",
+    "levelRequired",
+]
+TEXT_PRICE_COLUMNS = ["name", "baseType"]
+PRICE_LOAD_KEYS = {
+    "UnlinkedOnly",
+    "IgnoreFatedUniques",
+    "UseBlacklist",
+    "PriceHistoryHalfLifeHours",
+}
+GRID_COLUMNS = 12
+GRID_ROWS = 11
+ITEM_SECTION_SEPARATOR = "--------"
+ITEM_LEVEL_LABELS = [
+    "Item Level",
+    "Gegenstandsstufe",
+    "Niveau de l'objet",
+    "Уровень предмета",
+    "Nivel de Objeto",
+    "Nível do Item",
+]
+ITEM_HEADER_PATTERN = re.compile(r"[^\n]*\n[^\n]*\n([^\n]*)")
+ITEM_LEVEL_PATTERN = re.compile(
+    r"^(?:%s):\s*(\d+)" % "|".join(re.escape(label) for label in ITEM_LEVEL_LABELS),
+    re.MULTILINE,
+)
 
-import pandas as pd
-from requests import get
+
+def replace_file(path: str, write, mode: str = "w") -> None:
+    temp = f"{path}.{getpid()}.{get_ident()}.tmp"
+    with open(temp, mode) as f:
+        write(f)
+    replace(temp, path)
 
 
 class Config:
+    _shared = None
+    _shared_lock = Lock()
+
     def __init__(self) -> None:
         self.base_defaults = {
             "Hotkey": "F6",
+            "HotkeyDebounce": "0.3",
             "RefreshPricesOnStart": "True",
+            "PriceCacheMinutes": "60",
             "MouseMoveDelay": "0.01",
+            "ClipboardTimeout": "0.03",
+            "SkipEmptyCells": "False",
+            "EmptyCellThreshold": "12.0",
             "Language": "EN",
             "League": "Expedition",
+            "SnapshotCacheSize": "3",
             "WindowTitle": "Path of Exile",
+            "ScanEngine": "Python",
+            "ProfileScans": "False",
+            "PriceRefreshMinutes": "0",
         }
         self.prices_defaults = {
             "UnlinkedOnly": "True",
@@ -24,6 +90,12 @@ class Config:
             "UseBlacklist": "True",
             "MinItemLevelRestriction": "False",
             "SortBy": "Chaos Average",
+            "PriceHistoryHalfLifeHours": "0",
+            "ExpectedValue": "Listings",
+            "EVWeighting": "Listings",
+            "UniqueChance": "1.0",
+            "GambleCost": "0.0",
+            "MonteCarloSamples": "10000",
         }
         self.screen_defaults = {
             "GridTopLeftCornerX": "310",
@@ -36,10 +108,44 @@ class Config:
             "Prices": self.prices_defaults,
             "Screen": self.screen_defaults,
         }
+        self.listeners = []
         if "config.ini" not in listdir(getcwd()):
             self.create_config()
+        self.parser = self.load_config()
         self.verify_config()
 
+    @classmethod
+    def shared(cls) -> Config:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __getitem__(self, section: str):
+        return self.parser[section]
+
+    def add_listener(self, callback) -> None:
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def update(self, values: dict) -> set:
+        changed = set()
+        with self._shared_lock:
+            for section in self.sections:
+                for key in self.parser[section]:
+                    if key in values and str(values[key]) != self.parser[section][key]:
+                        self.parser[section][key] = str(values[key])
+                        changed.add(key)
+            if changed:
+                self.save_config(self.parser)
+        if changed:
+            for callback in list(self.listeners):
+                callback(changed)
+        return changed
+
     def create_config(self) -> None:
         cfg = ConfigParser()
         cfg.optionxform = str
@@ -61,13 +167,18 @@ class Config:
             config.write(f)
 
     def verify_config(self) -> None:
-        cfg = self.load_config()
+        cfg = self.parser
+        missing = False
         for section in self.sections:
+            if not cfg.has_section(section):
+                cfg.add_section(section)
             section_dict = self.sections[section]
             for key in section_dict:
                 if key not in cfg[section].keys():
                     cfg[section].update({key: section_dict[key]})
-        self.save_config(cfg)
+                    missing = True
+        if missing:
+            self.save_config(cfg)
 
     @staticmethod
     def get_display_size() -> tuple:
@@ -122,7 +233,10 @@ class Config:
 
 class TradingWindow:
     def __init__(self) -> None:
-        cfg = Config().load_config()["Screen"]
+        self.load_geometry()
+
+    def load_geometry(self) -> None:
+        cfg = Config.shared()["Screen"]
         self.top_left_corner = (
             int(cfg.get("GridTopLeftCornerX")),
             int(cfg.get("GridTopLeftCornerY")),
@@ -132,86 +246,775 @@ class TradingWindow:
             int(cfg.get("GridBottomRightCornerY")),
         )
         self.square_width = (
-            abs(self.bottom_right_corner[0] - self.top_left_corner[0]) / 12
+            abs(self.bottom_right_corner[0] - self.top_left_corner[0]) / GRID_COLUMNS
         )
         self.square_height = (
-            abs(self.bottom_right_corner[1] - self.top_left_corner[1]) / 11
+            abs(self.bottom_right_corner[1] - self.top_left_corner[1]) / GRID_ROWS
         )
 
     def get_grid(self) -> list:
         out = []
         y = self.top_left_corner[1] + self.square_height // 2
-        for _ in range(11):
+        for _ in range(GRID_ROWS):
             x = self.top_left_corner[0] + self.square_width // 2
-            for __ in range(12):
+            for __ in range(GRID_COLUMNS):
                 out.append((x, y))
                 x += self.square_width
             y += self.square_height
         return out
 
+    def get_region(self) -> tuple:
+        left, top = self.top_left_corner
+        return (
+            left,
+            top,
+            self.bottom_right_corner[0] - left,
+            self.bottom_right_corner[1] - top,
+        )
+
+    @staticmethod
+    def find_items(image, threshold: float, samples: int = 8) -> list:
+        import numpy as np
+
+        gray = np.asarray(image, dtype="float32")
+        if gray.ndim == 3:
+            gray = gray[..., :3].mean(axis=2)
+        cell_height = gray.shape[0] / GRID_ROWS
+        cell_width = gray.shape[1] / GRID_COLUMNS
+        offsets = np.linspace(0.2, 0.8, samples)
+        ys = ((np.arange(GRID_ROWS)[:, None] + offsets) * cell_height).astype(int)
+        xs = ((np.arange(GRID_COLUMNS)[:, None] + offsets) * cell_width).astype(int)
+
+        cells = gray[ys[:, None, :, None], xs[None, :, None, :]]
+        spread = cells.std(axis=(2, 3))
+        occupied = spread > threshold
+        if not occupied.all():
+            means = cells.mean(axis=(2, 3))
+            background = np.median(means[~occupied])
+            occupied |= np.abs(means - background) > threshold
+
+        border_offsets = np.linspace(0.2, 0.8, samples * 4)
+        dense_ys = (np.arange(GRID_ROWS)[:, None] + border_offsets) * cell_height
+        dense_xs = (np.arange(GRID_COLUMNS)[:, None] + border_offsets) * cell_width
+        border_x = (np.arange(1, GRID_COLUMNS) * cell_width).astype(int)
+        vertical = gray[dense_ys.astype(int)[:, None, :], border_x[None, :, None]]
+        join_right = (
+            (vertical.std(axis=2) > threshold / 2) & occupied[:, :-1] & occupied[:, 1:]
+        )
+        border_y = (np.arange(1, GRID_ROWS) * cell_height).astype(int)
+        horizontal = gray[border_y[:, None, None], dense_xs.astype(int)[None, :, :]]
+        join_down = (
+            (horizontal.std(axis=2) > threshold / 2)
+            & occupied[:-1, :]
+            & occupied[1:, :]
+        )
+
+        parents = list(range(GRID_ROWS * GRID_COLUMNS))
+
+        def find(cell: int) -> int:
+            while parents[cell] != cell:
+                parents[cell] = parents[parents[cell]]
+                cell = parents[cell]
+            return cell
+
+        for row, col in zip(*np.nonzero(join_right)):
+            cell = row * GRID_COLUMNS + col
+            parents[find(cell + 1)] = find(cell)
+        for row, col in zip(*np.nonzero(join_down)):
+            cell = row * GRID_COLUMNS + col
+            parents[find(cell + GRID_COLUMNS)] = find(cell)
+
+        items = {}
+        for row, col in zip(*np.nonzero(occupied)):
+            cell = int(row * GRID_COLUMNS + col)
+            items.setdefault(find(cell), []).append(cell)
+        return sorted(items.values())
+
+    def get_item_grid(self, image, threshold: float) -> list:
+        grid = self.get_grid()
+        return [grid[cells[0]] for cells in self.find_items(image, threshold)]
+
 
 class Item:
+    __slots__ = ("text", "base", "item_level")
+
     def __init__(self, text: str = None) -> None:
         self.text = text
         self.parse()
 
     def parse(self) -> None:
-        sections = self.text.split("--------")
-        section_1 = sections[0].split("\n")
-        base_type = section_1[2].strip("\n \r")
-        properties = {"base": base_type}
-        for line in self.text.split("\n"):
-            if ":" in line:
-                vals = line.split(":")
-                properties[vals[0].strip("\n \r")] = vals[1].strip("\n \r")
-        self.properties = properties
+        match = ITEM_HEADER_PATTERN.match(self.text)
+        if match is None or ITEM_SECTION_SEPARATOR in match.group(0):
+            raise IndexError("item text has no base type line")
+        self.base = match.group(1).strip("\n \r")
+        level = ITEM_LEVEL_PATTERN.search(self.text)
+        self.item_level = None if level is None else level.group(1)
+
+    @property
+    def properties(self) -> dict:
+        properties = {"base": self.base}
+        if self.item_level is not None:
+            properties["Item Level"] = self.item_level
+        return properties
+
+    @classmethod
+    def parse_many(cls, texts) -> list:
+        records = []
+        for text in texts:
+            try:
+                records.append(cls(text).properties)
+            except IndexError:
+                pass
+        return records
+
+
+class PriceCache:
+    def __init__(self, path: str = "price_cache", ttl: float = 3600.0) -> None:
+        self.path = path
+        self.ttl = ttl
+        makedirs(path, exist_ok=True)
+        self.index = self.load_index()
+
+    @staticmethod
+    def make_key(league: str, language: str, category: str) -> str:
+        return f"{league}|{language.upper()}|{category}"
+
+    def load_index(self) -> dict:
+        try:
+            with open(join(self.path, "index.json"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"entries": {}}
+
+    def save_index(self) -> None:
+        replace_file(join(self.path, "index.json"), lambda f: json.dump(self.index, f))
+
+    def data_file(self, key: str) -> str:
+        return join(self.path, f"{quote(key, safe='')}.json")
+
+    def is_fresh(self, key: str, now: float = None) -> bool:
+        entry = self.index["entries"].get(key)
+        if entry is None or not exists(self.data_file(key)):
+            return False
+        now = time() if now is None else now
+        return now - entry["fetched_at"] < self.ttl
+
+    def validators(self, key: str) -> dict:
+        entry = self.index["entries"].get(key)
+        if entry is None or not exists(self.data_file(key)):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(
+        self, key: str, lines: list, etag: str = None, last_modified: str = None
+    ) -> None:
+        replace_file(self.data_file(key), lambda f: json.dump(lines, f))
+        self.index["entries"][key] = {
+            "fetched_at": time(),
+            "ttl": self.ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def touch(self, key: str) -> None:
+        entry = self.index["entries"][key]
+        entry["fetched_at"] = time()
+        entry["ttl"] = self.ttl
+
+    def load(self, key: str) -> pd.DataFrame:
+        import pandas as pd
+
+        with open(self.data_file(key), "r") as f:
+            return pd.DataFrame.from_records(json.load(f))
+
+
+def price_array(df: pd.DataFrame, col: str):
+    import numpy as np
+    import pandas as pd
+
+    values = df[col] if col in df else pd.Series(np.nan, index=df.index)
+    if col in TEXT_PRICE_COLUMNS:
+        return values.fillna("").astype(str).to_numpy(dtype=str)
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+
+
+class PriceStore:
+    def __init__(self, path: str = "prices", keep: int = 2) -> None:
+        self.path = path
+        self.keep = keep
+
+    @classmethod
+    def for_snapshot(
+        cls, league: str, language: str, root: str = "prices"
+    ) -> PriceStore:
+        return cls(join(root, quote(f"{league}_{language.upper()}", safe="")))
+
+    def pointer_file(self) -> str:
+        return join(self.path, "CURRENT")
+
+    def current_path(self) -> str:
+        try:
+            with open(self.pointer_file(), "r") as f:
+                return join(self.path, f.read().strip())
+        except FileNotFoundError:
+            return self.path
+
+    def column_file(self, column: str, path: str = None) -> str:
+        path = self.current_path() if path is None else path
+        return join(path, f"{column}.npy")
+
+    def exists(self) -> bool:
+        path = self.current_path()
+        return all(exists(self.column_file(col, path)) for col in PRICE_COLUMNS)
+
+    def versions(self) -> list:
+        if not exists(self.path):
+            return []
+        return sorted(
+            name
+            for name in listdir(self.path)
+            if name.startswith("v") and isdir(join(self.path, name))
+        )
+
+    def write(self, df: pd.DataFrame) -> None:
+        import numpy as np
+
+        version = f"v{int(time() * 1000):015d}"
+        path = join(self.path, version)
+        makedirs(path, exist_ok=True)
+        for col in PRICE_COLUMNS:
+            np.save(
+                self.column_file(col, path), price_array(df, col), allow_pickle=False
+            )
+        replace_file(self.pointer_file(), lambda f: f.write(version))
+        for old in self.versions()[: -self.keep]:
+            rmtree(join(self.path, old), ignore_errors=True)
+
+    def read(self, columns: list = None) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        columns = PRICE_COLUMNS if columns is None else columns
+        path = self.current_path()
+        return pd.DataFrame(
+            {
+                col: np.load(
+                    self.column_file(col, path), mmap_mode="r", allow_pickle=False
+                )
+                for col in columns
+            },
+            copy=False,
+        )
+
+
+class PriceHistory:
+    def __init__(self, path: str = "price_history") -> None:
+        self.path = path
+
+    @classmethod
+    def for_snapshot(
+        cls, league: str, language: str, root: str = "price_history"
+    ) -> PriceHistory:
+        return cls(join(root, quote(f"{league}_{language.upper()}", safe="")))
+
+    def chunk_file(self, stamp: int) -> str:
+        return join(self.path, f"{stamp:015d}.npz")
+
+    def chunks(self, start: float = None, end: float = None) -> list:
+        if not exists(self.path):
+            return []
+        stamps = sorted(int(f[:-4]) for f in listdir(self.path) if f.endswith(".npz"))
+        return [
+            stamp
+            for stamp in stamps
+            if (start is None or stamp >= start * 1000)
+            and (end is None or stamp <= end * 1000)
+        ]
+
+    def append(self, df: pd.DataFrame, timestamp: float = None) -> None:
+        import numpy as np
+
+        timestamp = time() if timestamp is None else timestamp
+        makedirs(self.path, exist_ok=True)
+        replace_file(
+            self.chunk_file(int(timestamp * 1000)),
+            lambda f: np.savez_compressed(
+                f, **{col: price_array(df, col) for col in PRICE_COLUMNS}
+            ),
+            mode="wb",
+        )
+
+    def read(
+        self, start: float = None, end: float = None, columns: list = None
+    ) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        columns = PRICE_COLUMNS if columns is None else columns
+        frames = []
+        for stamp in self.chunks(start, end):
+            with np.load(self.chunk_file(stamp), allow_pickle=False) as chunk:
+                frame = pd.DataFrame({col: chunk[col] for col in columns})
+            frame["timestamp"] = stamp / 1000
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=columns + ["timestamp"])
+        return pd.concat(frames, ignore_index=True)
+
+    def decayed(
+        self, half_life: float, now: float = None, start: float = None
+    ) -> pd.DataFrame:
+        import pandas as pd
+
+        history = self.read(
+            start=start,
+            columns=["name", "baseType", "links", "chaosValue", "listingCount"],
+        )
+        now = time() if now is None else now
+        weight = 0.5 ** ((now - history["timestamp"].astype("float64")) / half_life)
+        history = pd.DataFrame(
+            {
+                "name": history["name"],
+                "baseType": history["baseType"],
+                "links": history["links"].astype("float64").fillna(0),
+                "weight": weight.where(history["chaosValue"].notna(), 0),
+                "chaos": history["chaosValue"].astype("float64") * weight,
+                "listings": history["listingCount"].astype("float64") * weight,
+            }
+        )
+        sums = history.groupby(["name", "baseType", "links"])[
+            ["weight", "chaos", "listings"]
+        ].sum()
+        return pd.DataFrame(
+            {
+                "chaosValue": sums["chaos"] / sums["weight"],
+                "listingCount": sums["listings"] / sums["weight"],
+            }
+        )
+
+    def apply_decay(
+        self, prices: pd.DataFrame, half_life: float, now: float = None
+    ) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        now = time() if now is None else now
+        decayed = self.decayed(half_life, now=now, start=now - 10 * half_life)
+        if decayed.empty:
+            return prices
+        keys = pd.MultiIndex.from_arrays(
+            [
+                prices["name"],
+                prices["baseType"].fillna("").astype(str),
+                prices["links"].astype("float64").fillna(0),
+            ]
+        )
+        current = decayed.reindex(keys)
+        prices = prices.copy()
+        for col in ["chaosValue", "listingCount"]:
+            values = current[col].to_numpy(dtype="float64")
+            prices[col] = np.where(np.isnan(values), prices[col].to_numpy(), values)
+        return prices
 
 
 class Prices:
-    def __init__(self) -> None:
-        if "prices.json" not in listdir(getcwd()):
+    def __init__(
+        self,
+        base_url: str = POE_NINJA_URL,
+        timeout: float = 10.0,
+        retries: int = 3,
+        cache: PriceCache = None,
+        store: PriceStore = None,
+        league: str = None,
+        language: str = None,
+    ) -> None:
+        cfg = Config.shared()
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.league = cfg["Base"].get("League") if league is None else league
+        self.language = cfg["Base"].get("Language") if language is None else language
+        self.cache = PriceCache() if cache is None else cache
+        if store is None:
+            store = PriceStore.for_snapshot(self.league, self.language)
+        self.store = store
+        self.history = PriceHistory.for_snapshot(self.league, self.language)
+        if not self.store.exists():
             self.fetch_prices()
 
-    def fetch_prices(self, league: str = "Standard", language: str = "EN") -> None:
-        categories = ["UniqueWeapon", "UniqueArmour", "UniqueAccessory", "UniqueJewel"]
-        df = pd.DataFrame()
-        for cat in categories:
-            req = get(
-                f"https://poe.ninja/api/data/ItemOverview?league={league}&type={cat}&language={language.lower()}"
+    def store_for(self, league: str, language: str) -> PriceStore:
+        if (league, language.upper()) == (self.league, self.language.upper()):
+            return self.store
+        return PriceStore.for_snapshot(league, language)
+
+    def history_for(self, league: str, language: str) -> PriceHistory:
+        if (league, language.upper()) == (self.league, self.language.upper()):
+            return self.history
+        return PriceHistory.for_snapshot(league, language)
+
+    def make_session(self, pool_size: int) -> Session:
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        session = Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def fetch_category(
+        self, session: Session, league: str, language: str, category: str
+    ) -> bool:
+        key = self.cache.make_key(league, language, category)
+        req = session.get(
+            self.base_url,
+            params={"league": league, "type": category, "language": language.lower()},
+            headers=self.cache.validators(key),
+            timeout=self.timeout,
+        )
+        if req.status_code == 304:
+            self.cache.touch(key)
+            return False
+        req.raise_for_status()
+        lines = [
+            {col: line.get(col) for col in PRICE_COLUMNS}
+            for line in req.json()["lines"]
+        ]
+        self.cache.store(
+            key,
+            lines,
+            etag=req.headers.get("ETag"),
+            last_modified=req.headers.get("Last-Modified"),
+        )
+        return True
+
+    def fetch_prices(self, league: str = None, language: str = None) -> bool:
+        import pandas as pd
+
+        league = self.league if league is None else league
+        language = self.language if language is None else language
+        store = self.store_for(league, language)
+        stale = [
+            cat
+            for cat in PRICE_CATEGORIES
+            if not self.cache.is_fresh(self.cache.make_key(league, language, cat))
+        ]
+        changed = False
+        if stale:
+            with self.make_session(len(stale)) as session:
+                with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                    changed = any(
+                        list(
+                            executor.map(
+                                lambda cat: self.fetch_category(
+                                    session, league, language, cat
+                                ),
+                                stale,
+                            )
+                        )
+                    )
+        if changed or not store.exists():
+            df = pd.concat(
+                [
+                    self.cache.load(self.cache.make_key(league, language, cat))
+                    for cat in PRICE_CATEGORIES
+                ],
+                ignore_index=True,
             )
-            df = df.append(pd.DataFrame.from_records(req.json()["lines"]))
-        df.reset_index(inplace=True, drop=True)
-        df.to_json("prices.json")
+            store.write(df)
+            if changed:
+                self.history_for(league, language).append(df)
+            changed = True
+        self.cache.save_index()
+        return changed
 
     def load_prices(self, show_ignored: bool = False) -> pd.DataFrame:
-        prices = pd.read_json("prices.json")
+        prices = self.store.read()
+        cfg = Config.shared()
+        half_life = float(cfg["Prices"].get("PriceHistoryHalfLifeHours", fallback="0"))
+        if half_life > 0:
+            prices = self.history.apply_decay(prices, half_life * 3600)
         prices["name"] = prices["name"].str.strip()
-        prices["name"] = prices["name"].apply(capwords)
+        prices["name_key"] = prices["name"].str.casefold()
         prices["Items"] = 1
-        cfg = Config().load_config()
-        ignores = Blacklist().read_ignore_lists()
-        prices["Fated"] = False
-        prices["Blacklisted"] = False
+        blacklist = Blacklist.shared()
+        prices["Fated"] = prices["name_key"].isin(blacklist.fated) & (
+            cfg["Prices"].get("IgnoreFatedUniques") == "True"
+        )
+        prices["Blacklisted"] = prices["name_key"].isin(blacklist.blacklist) & (
+            cfg["Prices"].get("UseBlacklist") == "True"
+        )
         if cfg["Prices"].get("UnlinkedOnly") == "True":
             prices = prices.loc[prices["links"].isna()]
-        if cfg["Prices"].get("IgnoreFatedUniques") == "True":
-            prices.loc[prices["name"].isin(set(ignores["fated"])), "Fated"] = True
-        if cfg["Prices"].get("UseBlacklist") == "True":
-            print(set(ignores["blacklist"]))
-            prices.loc[
-                prices["name"].isin(set(ignores["blacklist"])), "Blacklisted"
-            ] = True
         if show_ignored:
             return prices
-        return prices.loc[(prices["Fated"] == False) & (prices["Blacklisted"] == False)]
+        return PriceIndex.visible(prices)
+
+
+class BaseTypeIndex:
+    def __init__(self, base_types) -> None:
+        self.exact = {}
+        self.trie = {}
+        for base in base_types:
+            self.add(base)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        name = unicodedata.normalize("NFKC", name).casefold()
+        return " ".join(name.replace("’", "'").split())
+
+    def add(self, base: str) -> None:
+        key = self.normalize(base)
+        bases = self.exact.setdefault(key, [])
+        if base not in bases:
+            bases.append(base)
+        node = self.trie
+        for token in key.split():
+            node = node.setdefault(token, {})
+        node[""] = bases
+
+    def resolve(self, name: str) -> tuple:
+        key = self.normalize(name)
+        if key in self.exact:
+            bases = self.exact[key]
+            return (bases[0] if len(bases) == 1 else None), list(bases)
+        tokens = key.split()
+        longest = 0
+        candidates = []
+        for start in range(len(tokens)):
+            node = self.trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if "" in node:
+                    length = end - start + 1
+                    if length > longest:
+                        longest = length
+                        candidates = list(node[""])
+                    elif length == longest:
+                        candidates.extend(b for b in node[""] if b not in candidates)
+        return (candidates[0] if len(candidates) == 1 else None), candidates
+
+
+class PriceIndex:
+    def __init__(self, prices: pd.DataFrame) -> None:
+        self.prices = prices
+        self.blacklisted = prices["Blacklisted"]
+        self.table = self.build(self.visible(prices))
+        self.rows = dict(
+            zip(self.table.index, self.table.itertuples(index=False, name=None))
+        )
+        self.base_types = BaseTypeIndex(prices["baseType"].unique())
+        self.resolved = {}
+        self.ambiguous = {}
+        self.ev = None
+        self.positions = None
+
+    @staticmethod
+    def visible(prices: pd.DataFrame, blacklisted: pd.Series = None) -> pd.DataFrame:
+        if blacklisted is None:
+            blacklisted = prices["Blacklisted"]
+        return prices.loc[~(prices["Fated"] | blacklisted.reindex(prices.index))]
+
+    def set_blacklisted(self, names, blacklisted: bool) -> None:
+        keys = {Blacklist.normalize(name) for name in names}
+        mask = self.prices["name_key"].isin(keys)
+        if not mask.any():
+            return
+        flags = self.blacklisted.copy()
+        flags[mask] = blacklisted
+        self.blacklisted = flags
+        self.rebuild_bases(self.prices.loc[mask, "baseType"].unique())
+        self.ev = None
+
+    def rebuild_bases(self, bases) -> None:
+        import pandas as pd
+
+        subset = self.prices.loc[self.prices["baseType"].isin(bases)]
+        table = self.build(self.visible(subset, self.blacklisted))
+        rows = dict(self.rows)
+        for base in bases:
+            rows.pop(base, None)
+        rows.update(zip(table.index, table.itertuples(index=False, name=None)))
+        self.table = pd.concat([self.table.drop(bases, errors="ignore"), table])
+        self.rows = rows
+
+    def canonical(self, name: str) -> str:
+        if name in self.resolved:
+            return self.resolved[name]
+        base, candidates = self.base_types.resolve(name)
+        if base is None:
+            base = name
+            if len(candidates) > 1:
+                self.ambiguous[name] = candidates
+        self.resolved[name] = base
+        return base
+
+    @staticmethod
+    def build(prices: pd.DataFrame) -> pd.DataFrame:
+        table = (
+            prices.assign(ev_helper=prices["chaosValue"] * prices["listingCount"])
+            .groupby("baseType")
+            .agg(
+                **{
+                    "Items": ("Items", "sum"),
+                    "Chaos Min": ("chaosValue", "min"),
+                    "Chaos Average": ("chaosValue", "mean"),
+                    "Chaos Max": ("chaosValue", "max"),
+                    "ev_helper": ("ev_helper", "sum"),
+                    "listingCount": ("listingCount", "sum"),
+                }
+            )
+        )
+        table["Expected Chaos"] = table["ev_helper"] / table["listingCount"]
+        return table[
+            ["Items", "Chaos Min", "Chaos Average", "Chaos Max", "Expected Chaos"]
+        ]
+
+    def ev_model(self, cfg: Config, mode: str = None):
+        import ev
+
+        settings = ev.EVModel.settings(cfg, mode)
+        if settings is None:
+            return None
+        current = self.ev
+        if current is None or current[0] != settings:
+            prices = self.visible(self.prices, self.blacklisted)
+            current = (settings, ev.EVModel(prices, **settings))
+            self.ev = current
+        return current[1]
+
+    def uniques(self, base: str) -> pd.DataFrame:
+        if self.positions is None:
+            self.positions = self.prices.groupby("baseType").indices
+        positions = self.positions.get(base, [])
+        return self.prices.iloc[positions].assign(
+            Blacklisted=self.blacklisted.iloc[positions].to_numpy()
+        )
+
+    def lookup(self, bases: pd.Series) -> pd.DataFrame:
+        return self.table.reindex(bases.values).reset_index(drop=True)
+
+
+class SnapshotStore:
+    _shared = None
+    _shared_lock = Lock()
+
+    def __init__(self, capacity: int = 3) -> None:
+        self.capacity = capacity
+        self.snapshots = OrderedDict()
+        self.lock = Lock()
+
+    @classmethod
+    def shared(cls) -> SnapshotStore:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cfg = Config.shared()
+                capacity = cfg["Base"].get("SnapshotCacheSize", "3")
+                cls._shared = cls(capacity=int(capacity))
+                cfg.add_listener(cls._shared.on_config_change)
+                Blacklist.shared().add_listener(cls._shared.on_blacklist_change)
+            return cls._shared
+
+    def on_config_change(self, changed: set) -> None:
+        cfg = Config.shared()
+        if "SnapshotCacheSize" in changed:
+            with self.lock:
+                self.capacity = int(cfg["Base"].get("SnapshotCacheSize", "3"))
+                while len(self.snapshots) > max(self.capacity, 1):
+                    self.snapshots.popitem(last=False)
+        if changed & PRICE_LOAD_KEYS:
+            self.invalidate()
+
+    def on_blacklist_change(self, item_names: list, blacklisted: bool) -> None:
+        if Config.shared()["Prices"].get("UseBlacklist") != "True":
+            return
+        for index in self.indexes():
+            index.set_blacklisted(item_names, blacklisted)
+
+    @staticmethod
+    def make_key(league: str, language: str) -> tuple:
+        return league, language.upper()
+
+    def get(self, league: str, language: str) -> PriceIndex:
+        key = self.make_key(league, language)
+        with self.lock:
+            if key in self.snapshots:
+                self.snapshots.move_to_end(key)
+                return self.snapshots[key]
+        index = PriceIndex(Prices(league=league, language=language).load_prices(True))
+        self.put(league, language, index)
+        return index
+
+    def put(self, league: str, language: str, index: PriceIndex) -> None:
+        with self.lock:
+            self.snapshots[self.make_key(league, language)] = index
+            self.snapshots.move_to_end(self.make_key(league, language))
+            while len(self.snapshots) > max(self.capacity, 1):
+                self.snapshots.popitem(last=False)
+
+    def indexes(self) -> list:
+        with self.lock:
+            return list(self.snapshots.values())
+
+    def invalidate(self, league: str = None, language: str = None) -> None:
+        with self.lock:
+            if league is None or language is None:
+                self.snapshots.clear()
+            else:
+                self.snapshots.pop(self.make_key(league, language), None)
 
 
 class Blacklist:
+    _shared = None
+    _shared_lock = Lock()
+
     def __init__(self) -> None:
         if not "fated_uniques.txt" in listdir(getcwd()):
             self.set_up_fated_uniques()
         if not "blacklist.txt" in listdir(getcwd()):
             self.set_up_blacklist()
+        ignores = self.read_ignore_lists()
+        self.fated = {self.normalize(item) for item in ignores["fated"]}
+        self.blacklist = {self.normalize(item) for item in ignores["blacklist"]}
+        self.listeners = []
+
+    @classmethod
+    def shared(cls) -> Blacklist:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().casefold()
+
+    def add_listener(self, callback) -> None:
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self, item_names: list, blacklisted: bool) -> None:
+        for callback in list(self.listeners):
+            callback(item_names, blacklisted)
 
     @staticmethod
     def set_up_fated_uniques() -> None:
@@ -232,22 +1035,26 @@ class Blacklist:
         with open("fated_uniques.txt", "r") as f:
             fated = f.readlines()
         return {
-            "fated": [capwords(item) for item in fated],
-            "blacklist": [capwords(item) for item in blacklist],
+            "fated": [capwords(item) for item in fated if item.strip()],
+            "blacklist": [capwords(item) for item in blacklist if item.strip()],
         }
 
-    @staticmethod
-    def add_to_blacklist(item_names: list) -> None:
+    def add_to_blacklist(self, item_names: list) -> None:
         with open("blacklist.txt", "a") as f:
             for item in item_names:
                 f.write(f"\n{item}")
+        self.blacklist.update(self.normalize(item) for item in item_names)
+        self.notify(item_names, True)
 
     def remove_from_blacklist(self, item_names: list) -> None:
-        existing = [item.strip(" \n") for item in self.read_ignore_lists()["blacklist"]]
-        new_blacklist = [item for item in existing if item not in item_names]
+        keys = {self.normalize(item) for item in item_names}
+        existing = self.read_ignore_lists()["blacklist"]
+        new_blacklist = [item for item in existing if self.normalize(item) not in keys]
         with open("blacklist.txt", "w") as f:
             for item in new_blacklist:
                 f.write(f"\n{item}")
+        self.blacklist.difference_update(keys)
+        self.notify(item_names, False)
 
 
 class VersionCheck:
@@ -257,6 +1064,8 @@ class VersionCheck:
 
     @staticmethod
     def get_latest_version() -> float:
+        from requests import get
+
         req = get("https://api.github.com/repos/Elkosscom/poe_gwennen_gambler/releases")
         releases = [float(release["tag_name"]) for release in req.json()]
         releases.sort()
@@ -266,6 +1075,8 @@ class VersionCheck:
         return self.version >= self.latest_version
 
     def open_latest_version_page(self) -> None:
+        import webbrowser
+
         webbrowser.open(
             f"https://github.com/Elkosscom/poe_gwennen_gambler/releases/tag/{self.latest_version}"
         )
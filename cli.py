@@ -0,0 +1,229 @@
+import argparse
+import csv
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count, listdir
+from os.path import isdir, isfile, join
+
+import classes
+import ev
+import logic
+
+ITEM_SEPARATOR_PATTERN = re.compile(r"\r?\n\s*\r?\n")
+PRICER = None
+
+
+class ShopPricer:
+    def __init__(
+        self,
+        league: str,
+        language: str,
+        budget: int = None,
+        item_cost: int = 1,
+        summary: bool = False,
+    ) -> None:
+        self.cfg = classes.Config.shared()
+        self.index = classes.PriceIndex(
+            classes.Prices(league=league, language=language).load_prices(True)
+        )
+        self.budget = budget
+        self.item_cost = item_cost
+        self.summary = summary
+
+    def price(self, shop: tuple) -> list:
+        shop_id, items = shop
+        records = parse_items(items)
+        if self.summary:
+            summary = logic.ev_summary(records, index=self.index, cfg=self.cfg)
+            rows = summary.values.tolist()
+        elif self.budget is None:
+            rows = logic.rank_items(records, index=self.index, cfg=self.cfg)
+        else:
+            rows = logic.plan_purchases(
+                records,
+                index=self.index,
+                cfg=self.cfg,
+                budget=self.budget,
+                default_cost=self.item_cost,
+            )
+        return [[shop_id] + list(row) for row in rows]
+
+
+def init_worker(
+    league: str, language: str, budget: int, item_cost: int, summary: bool
+) -> None:
+    global PRICER
+    PRICER = ShopPricer(
+        league, language, budget=budget, item_cost=item_cost, summary=summary
+    )
+
+
+def price_shop(shop: tuple) -> list:
+    return PRICER.price(shop)
+
+
+def price_batch(shops: list) -> list:
+    return [row for shop in shops for row in PRICER.price(shop)]
+
+
+def parse_items(items: list) -> list:
+    records = []
+    for item in items:
+        if isinstance(item, str):
+            text, cost = item, None
+        else:
+            text, cost = item["text"], item.get("cost")
+        for record in classes.Item.parse_many([text]):
+            if cost is not None:
+                record["Cost"] = int(cost)
+            records.append(record)
+    return records
+
+
+def split_items(text: str) -> list:
+    return [item for item in ITEM_SEPARATOR_PATTERN.split(text.strip()) if item]
+
+
+def read_shops(path: str):
+    if isdir(path):
+        for name in sorted(listdir(path)):
+            if isfile(join(path, name)):
+                with open(join(path, name), "r", encoding="utf-8") as f:
+                    yield name, split_items(f.read())
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            shop = json.loads(line)
+            yield str(shop.get("shop", shop.get("id", number))), shop["items"]
+
+
+def batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bounded_map(executor: ProcessPoolExecutor, func, iterable, window: int):
+    pending = []
+    for item in iterable:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def json_value(value):
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class ResultWriter:
+    def __init__(self, stream, columns: list, fmt: str) -> None:
+        self.stream = stream
+        self.columns = ["Shop"] + columns
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.writer(stream, lineterminator="\n")
+            self.writer.writerow(self.columns)
+
+    def write(self, rows: list) -> None:
+        if self.fmt == "csv":
+            self.writer.writerows(rows)
+            return
+        for row in rows:
+            record = {col: json_value(value) for col, value in zip(self.columns, row)}
+            self.stream.write(json.dumps(record) + "\n")
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    cfg = classes.Config.shared()
+    parser = argparse.ArgumentParser(
+        description="Price captured Gwennen shops without the GUI."
+    )
+    parser.add_argument(
+        "input",
+        help="directory with one shop per file (items separated by blank lines) "
+        'or a JSONL file with {"shop": ..., "items": [...]} per line, where an '
+        'item is its text or {"text": ..., "cost": ...}',
+    )
+    parser.add_argument("-o", "--output", help="output file (default stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"])
+    parser.add_argument("-w", "--workers", type=int, default=cpu_count() or 1)
+    parser.add_argument(
+        "--batch-size", type=int, default=64, help="shops sent to a worker at once"
+    )
+    parser.add_argument("--league", default=cfg["Base"].get("League"))
+    parser.add_argument("--language", default=cfg["Base"].get("Language"))
+    parser.add_argument(
+        "--budget", type=int, help="only output the best purchases for this coin budget"
+    )
+    parser.add_argument(
+        "--item-cost", type=int, default=1, help="cost of items without a cost"
+    )
+    parser.add_argument(
+        "--ev-summary",
+        action="store_true",
+        help="output the expected value, its spread, the chance of a profit over "
+        "GambleCost and percentiles of every item instead of the ranking",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="refresh prices before pricing"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> None:
+    args = parse_args(argv)
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output and args.output.endswith(".jsonl") else "csv"
+    prices = classes.Prices(league=args.league, language=args.language)
+    if args.refresh:
+        prices.fetch_prices()
+    columns = logic.PLAN_COLUMNS if args.budget is not None else logic.OUTPUT_COLUMNS
+    if args.ev_summary:
+        columns = ev.EV_COLUMNS
+    shops = read_shops(args.input)
+    stream = sys.stdout if args.output is None else open(args.output, "w", newline="")
+    try:
+        writer = ResultWriter(stream, columns, fmt)
+        init_args = (
+            args.league,
+            args.language,
+            args.budget,
+            args.item_cost,
+            args.ev_summary,
+        )
+        if args.workers <= 1:
+            init_worker(*init_args)
+            for shop in shops:
+                writer.write(price_shop(shop))
+            return
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=init_worker, initargs=init_args
+        ) as executor:
+            for rows in bounded_map(
+                executor,
+                price_batch,
+                batches(shops, args.batch_size),
+                args.workers * 4,
+            ):
+                writer.write(rows)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+EV_MODES = ["Listings", "Exact", "MonteCarlo"]
+EV_WEIGHTINGS = ["Listings", "Uniform"]
+EV_PERCENTILES = (10, 50, 90)
+EV_COLUMNS = [
+    "Base",
+    "Item Level",
+    "Unique Chance",
+    "EV",
+    "EV Std",
+    "P(Profit)",
+] + [f"P{percentile}" for percentile in EV_PERCENTILES]
+
+
+def listing_weights(prices: pd.DataFrame) -> np.ndarray:
+    return np.nan_to_num(prices["listingCount"].to_numpy(dtype="float64"))
+
+
+def uniform_weights(prices: pd.DataFrame) -> np.ndarray:
+    return np.ones(len(prices))
+
+
+WEIGHTINGS = {"Listings": listing_weights, "Uniform": uniform_weights}
+
+
+class EVModel:
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        unique_chance: float = 1.0,
+        cost: float = 0.0,
+        weighting="Listings",
+        monte_carlo: bool = False,
+        samples: int = 10000,
+        seed: int = 0,
+        percentiles: tuple = EV_PERCENTILES,
+    ) -> None:
+        import pandas as pd
+
+        self.unique_chance = unique_chance
+        self.cost = cost
+        self.monte_carlo = monte_carlo
+        self.samples = samples
+        self.seed = seed
+        self.sample_draws = {}
+        self.percentiles = percentiles
+        if not callable(weighting):
+            weighting = WEIGHTINGS[weighting]
+        weights = np.asarray(weighting(prices), dtype="float64")
+        values = prices["chaosValue"].to_numpy(dtype="float64")
+        levels = np.nan_to_num(prices["levelRequired"].to_numpy(dtype="float64"))
+        codes, bases = pd.factorize(prices["baseType"])
+        valid = (codes >= 0) & ~np.isnan(values) & (weights > 0)
+        codes, values, levels, weights = (
+            codes[valid],
+            values[valid],
+            levels[valid],
+            weights[valid],
+        )
+        order = np.lexsort((values, codes))
+        self.codes = codes[order]
+        self.values = values[order]
+        self.levels = levels[order]
+        self.weights = weights[order]
+        self.base_ids = {base: i for i, base in enumerate(bases)}
+        self.starts = np.searchsorted(self.codes, np.arange(len(bases)), side="left")
+        self.ends = np.searchsorted(self.codes, np.arange(len(bases)), side="right")
+
+    @staticmethod
+    def settings(cfg, mode: str = None) -> dict:
+        mode = cfg["Prices"].get("ExpectedValue") if mode is None else mode
+        if mode in (None, "Listings"):
+            return None
+        return {
+            "unique_chance": float(cfg["Prices"].get("UniqueChance")),
+            "cost": float(cfg["Prices"].get("GambleCost")),
+            "weighting": cfg["Prices"].get("EVWeighting"),
+            "monte_carlo": mode == "MonteCarlo",
+            "samples": int(cfg["Prices"].get("MonteCarloSamples")),
+        }
+
+    def join_queries(self, bases, levels) -> tuple:
+        codes = np.array([self.base_ids.get(base, -1) for base in bases], dtype=int)
+        levels = np.asarray(levels, dtype="float64")
+        levels = np.where(np.isnan(levels), np.inf, levels)
+        known = codes >= 0
+        starts = np.where(known, self.starts[np.maximum(codes, 0)], 0)
+        counts = np.where(known, self.ends[np.maximum(codes, 0)], 0) - starts
+        query = np.repeat(np.arange(len(codes)), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.arange(counts.sum()) - offsets + np.repeat(starts, counts)
+        keep = self.levels[rows] <= levels[query]
+        query, rows = query[keep], rows[keep]
+        weights = self.weights[rows]
+        total = np.bincount(query, weights, minlength=len(codes))
+        cumulative = np.cumsum(weights)
+        group_start = np.searchsorted(query, np.arange(len(codes)), side="left")
+        before = np.concatenate(([0.0], cumulative))[group_start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            keys = query + (cumulative - before[query]) / total[query]
+        return query, rows, total, keys
+
+    def pick(self, query, keys, group_ids, targets) -> np.ndarray:
+        first = np.searchsorted(query, group_ids, side="left")
+        last = np.searchsorted(query, group_ids, side="right") - 1
+        index = np.searchsorted(keys, group_ids + np.clip(targets, 1e-12, 1.0))
+        return np.clip(index, first, last)
+
+    def evaluate(self, bases, levels) -> dict:
+        query, rows, total, keys = self.join_queries(bases, levels)
+        count = len(total)
+        found = total > 0
+        chance = np.where(found, self.unique_chance, np.nan)
+        weights = self.weights[rows]
+        values = self.values[rows]
+        padded = np.append(values, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(query, weights * values, minlength=count) / total
+            second = np.bincount(query, weights * values ** 2, minlength=count) / total
+            above = (
+                np.bincount(query, weights * (values > self.cost), minlength=count)
+                / total
+            )
+        result = {
+            "unique_chance": chance,
+            "mean": chance * mean,
+            "variance": chance * second - (chance * mean) ** 2,
+            "p_profit": chance * above + (1 - chance) * (0 > self.cost),
+        }
+        group_ids = np.arange(count)
+        for percentile in self.percentiles:
+            target = percentile / 100
+            with np.errstate(divide="ignore", invalid="ignore"):
+                unique_target = np.nan_to_num((target - (1 - chance)) / chance)
+            picked = padded[self.pick(query, keys, group_ids, unique_target)]
+            result[f"p{percentile}"] = np.where(
+                found, np.where(unique_target > 0, picked, 0.0), np.nan
+            )
+        return result
+
+    def draws(self, samples: int) -> tuple:
+        if samples not in self.sample_draws:
+            rng = np.random.default_rng(self.seed)
+            self.sample_draws[samples] = rng.random(samples), rng.random(samples)
+        return self.sample_draws[samples]
+
+    def simulate(self, bases, levels, samples: int = None) -> dict:
+        samples = self.samples if samples is None else samples
+        query, rows, total, keys = self.join_queries(bases, levels)
+        count = len(total)
+        found = total > 0
+        padded = np.append(self.values[rows], 0.0)
+        group_ids = np.repeat(np.arange(count), samples)
+        unique_draws, pick_draws = self.draws(samples)
+        is_unique = np.tile(unique_draws < self.unique_chance, count)
+        index = self.pick(query, keys, group_ids, np.tile(pick_draws, count))
+        outcomes = np.where(is_unique, padded[index], 0.0)
+        outcomes = np.where(found[group_ids], outcomes, np.nan).reshape(count, samples)
+        with np.errstate(invalid="ignore"):
+            result = {
+                "unique_chance": np.where(found, self.unique_chance, np.nan),
+                "mean": outcomes.mean(axis=1),
+                "variance": outcomes.var(axis=1),
+                "p_profit": np.where(
+                    found, (outcomes > self.cost).mean(axis=1), np.nan
+                ),
+            }
+        for percentile in self.percentiles:
+            result[f"p{percentile}"] = np.where(
+                found,
+                np.percentile(np.nan_to_num(outcomes), percentile, axis=1),
+                np.nan,
+            )
+        return result
+
+    def expected(self, bases, levels) -> np.ndarray:
+        if self.monte_carlo:
+            return self.simulate(bases, levels)["mean"]
+        return self.evaluate(bases, levels)["mean"]
+
+    def summary(self, bases, levels) -> pd.DataFrame:
+        import pandas as pd
+
+        bases = list(bases)
+        levels = np.asarray(levels, dtype="float64")
+        if self.monte_carlo:
+            result = self.simulate(bases, levels)
+        else:
+            result = self.evaluate(bases, levels)
+        columns = [
+            bases,
+            levels,
+            result["unique_chance"],
+            result["mean"],
+            np.sqrt(np.maximum(result["variance"], 0)),
+            result["p_profit"],
+        ] + [result[f"p{percentile}"] for percentile in self.percentiles]
+        names = EV_COLUMNS[:6] + [f"P{percentile}" for percentile in self.percentiles]
+        return pd.DataFrame(dict(zip(names, columns)))
@@ -1,15 +1,17 @@
 import ctypes
 import platform
-from queue import Queue
 from threading import Thread
+from time import perf_counter
 
 import PySimpleGUI as sg
-from loguru import logger
 
 import classes
 import logic
+import metrics
 
 sg.theme("DarkTanBlue")
+DETAILS_COLUMNS = ["Name", "Chaos Price", "Listings", "Fated", "Blacklisted"]
+DETAILS_PAGE_SIZE = 25
 
 
 def make_dpi_aware():
@@ -17,32 +19,50 @@ def make_dpi_aware():
         ctypes.windll.shcore.SetProcessDpiAwareness(True)
 
 
-logger.add("log.log", rotation="1 MB", enqueue=True, backtrace=True, diagnose=True)
+def update_table(table: sg.Table, rows: list, select_rows: list = None) -> None:
+    tree = table.TKTreeview
+    old_rows = table.Values or []
+    for i, row in enumerate(rows[: len(old_rows)]):
+        if row != old_rows[i]:
+            tree.item(i + 1, text=row, values=row)
+    background = table.BackgroundColor
+    if background in (None, sg.COLOR_SYSTEM_DEFAULT):
+        background = "#FFFFFF"
+    for i in range(len(old_rows), len(rows)):
+        iid = tree.insert("", "end", text=rows[i], iid=i + 1, values=rows[i], tag=i)
+        tree.tag_configure(iid, background=background)
+    if len(old_rows) > len(rows):
+        tree.delete(*range(len(rows) + 1, len(old_rows) + 1))
+    table.tree_ids = [str(i) for i in range(1, len(rows) + 1)]
+    table.Values = rows
+    table.SelectedRows = []
+    if select_rows:
+        tree.selection_set([i + 1 for i in select_rows if i < len(rows)])
+
+
+def set_up_logging():
+    from loguru import logger
+
+    logger.add("log.log", rotation="1 MB", enqueue=True, backtrace=True, diagnose=True)
+    return logger
 
 
 class MainWindow:
     def __init__(self) -> None:
-        self.cfg = classes.Config().load_config()
-        table = logic.output_dataframe[
-            [
-                "Base",
-                "Item Level",
-                "Items",
-                "Chaos Min",
-                "Chaos Average",
-                "Chaos Max",
-                "Expected Chaos",
-            ]
-        ]
-        data = table.values.tolist()
-        headers = table.columns.tolist()
+        self.cfg = classes.Config.shared()
+        data = [["" for _ in logic.OUTPUT_COLUMNS]]
+        headers = logic.OUTPUT_COLUMNS
         self.layout = [
             [
                 sg.Button("Start program", k="start"),
                 sg.Button("Stop program", k="stop", disabled=True),
                 sg.Button("Edit Config", k="config"),
             ],
-            [sg.Text("Status:"), sg.Text("Stopped", k="status")],
+            [
+                sg.Text("Status:"),
+                sg.Text("Stopped", k="status"),
+                sg.Text("", k="scan_stats", size=(40, 1)),
+            ],
             [
                 sg.Table(
                     values=data,
@@ -55,7 +75,11 @@ class MainWindow:
                     k="table",
                 )
             ],
-            [sg.Button("View details", k="details")],
+            [
+                sg.Button("View details", k="details"),
+                sg.Button("Scan stats", k="stats"),
+                sg.Button("Export stats", k="export_stats"),
+            ],
         ]
         self.window = sg.Window(
             "Gwennen Gambler",
@@ -68,25 +92,77 @@ class MainWindow:
         self.window["start"].expand(True, True)
         self.window["stop"].expand(True, True)
         self.window["details"].expand(True, True)
+        self.window["stats"].expand(True, True)
+        self.window["export_stats"].expand(True, True)
         self.window["config"].expand(True, True)
-
-        self.prices = classes.Prices().load_prices(True)
+        self.output_dataframe = None
+        self.worker = None
+        self.details = None
+
+    def price_index(self) -> classes.PriceIndex:
+        worker = self.worker
+        if worker is not None and not worker.stop_event.is_set():
+            if worker.index is not None:
+                return worker.index
+        return classes.SnapshotStore.shared().get(
+            self.cfg["Base"].get("League"), self.cfg["Base"].get("Language")
+        )
 
     def main_loop(self) -> None:
         while True:
-            event, values = self.window.read(timeout=1000)
+            event, values = self.window.read()
             try:
                 selected = values["table"]
-            except (IndexError, TypeError):
+            except (IndexError, KeyError, TypeError):
                 selected = None
-            if logic.refresh:
-                self.window["table"].update(
-                    values=logic.output_dataframe.values.tolist(),
+
+            if event == logic.RESULTS_EVENT:
+                start = perf_counter()
+                self.output_dataframe = values[event]
+                update_table(
+                    self.window["table"],
+                    self.output_dataframe.values.tolist(),
                     select_rows=selected,
                 )
-                logic.refresh = False
+                metrics.MetricsHistory.shared().add_sample(
+                    "render", (perf_counter() - start) * 1000
+                )
+
+            if event == logic.METRICS_EVENT:
+                summary = values[event]
+                self.window["scan_stats"].update(
+                    f"Last scan {summary['total_ms'] / 1000:.2f}s, "
+                    f"{summary['counts'].get('items', 0)} items"
+                )
+
+            if event == "stats":
+                sg.popup_scrolled(
+                    metrics.MetricsHistory.shared().report(), title="Scan stats"
+                )
+
+            if event == "export_stats":
+                path = sg.popup_get_file(
+                    "Export scan stats to",
+                    save_as=True,
+                    default_extension=".json",
+                    file_types=(("JSON", "*.json"),),
+                )
+                if path:
+                    metrics.MetricsHistory.shared().export(path)
+
+            if event == logic.STATUS_EVENT:
+                running = values[event]
+                self.window["status"].update("Running" if running else "Stopped")
+                if not running:
+                    self.window["start"].update(disabled=False)
+                    self.window["stop"].update(disabled=True)
+                    self.window["config"].update(disabled=False)
 
             if event in [sg.WIN_CLOSED, "Quit"]:
+                if self.worker is not None:
+                    self.worker.stop()
+                if self.details is not None and not self.details.closed:
+                    self.details.window.close()
                 ver = classes.VersionCheck()
                 is_latest = ver.perform_version_check()
                 if not is_latest:
@@ -102,37 +178,34 @@ class MainWindow:
                 self.window["start"].update(disabled=True)
                 self.window["stop"].update(disabled=False)
                 self.window["config"].update(disabled=True)
-                q = Queue(maxsize=1)
-                t = Thread(target=logic.main, daemon=True, kwargs={"queue": q})
-                t.start()
-                while True:
-                    if logic.status is True:
-                        self.window["status"].update("Running")
-                        break
+                self.window["status"].update("Starting")
+                self.worker = logic.ScanWorker(publish=self.window.write_event_value)
+                Thread(target=self.worker.main, daemon=True).start()
 
             if event == "stop":
-                self.window["start"].update(disabled=False)
                 self.window["stop"].update(disabled=True)
-                self.window["config"].update(disabled=False)
-                q.put(True, block=False)
-                t.join(timeout=0)
-                while 1:
-                    if logic.status is False:
-                        self.window["status"].update("Stopped")
-                        break
+                self.window["status"].update("Stopping")
+                self.worker.stop()
 
             if event == "details":
                 try:
-                    df = logic.output_dataframe
-                    prices = classes.Prices().load_prices(True)
+                    df = self.output_dataframe
                     item_name = df.iloc[values["table"][0]]["Base"]
+                    scanned_level = df.iloc[values["table"][0]]["Item Level"]
                     item_level = 100
                     if self.cfg["Prices"].get("MinItemLevelRestriction") == "True":
-                        item_level = df.iloc[values["table"][0]]["Item Level"]
-                    ViewDetailsBaseType(
-                        prices=prices, basetype=item_name, item_level=item_level
-                    ).main_loop()
+                        item_level = scanned_level
+                    if self.details is None or self.details.closed:
+                        self.details = ViewDetailsBaseType()
+                    self.details.show(
+                        index=self.price_index(),
+                        basetype=item_name,
+                        item_level=item_level,
+                        scanned_level=scanned_level,
+                    )
                 except Exception:
+                    from loguru import logger
+
                     logger.exception("exc")
 
             if event == "config":
@@ -140,15 +213,7 @@ class MainWindow:
 
 
 class ViewDetailsBaseType:
-    def __init__(self, basetype, prices, item_level) -> None:
-        table = self.format_prices(prices=prices, basetype=basetype)
-        table["levelRequired"] = table["levelRequired"].fillna(0)
-        if item_level:
-            table = table.loc[table["levelRequired"] <= int(item_level)]
-        table = table[["Name", "Chaos Price", "Listings", "Fated", "Blacklisted"]]
-        self.table = table
-        headers = table.columns.tolist()
-        data = table.values.tolist()
+    def __init__(self) -> None:
         self.layout = [
             [
                 sg.Button("Add selection to blacklist", k="ignore"),
@@ -156,34 +221,103 @@ class ViewDetailsBaseType:
             ],
             [
                 sg.Table(
-                    values=data,
-                    headings=headers,
+                    values=[["" for _ in DETAILS_COLUMNS]],
+                    headings=DETAILS_COLUMNS,
                     display_row_numbers=False,
-                    auto_size_columns=True,
-                    num_rows=min(25, len(data)),
+                    auto_size_columns=False,
+                    col_widths=[30, 10, 8, 6, 10],
+                    num_rows=DETAILS_PAGE_SIZE,
+                    k="table",
                 )
             ],
+            [sg.Text("", k="ev", size=(70, 1))],
+            [
+                sg.Button("<", k="prev"),
+                sg.Text("", k="page", size=(14, 1), justification="center"),
+                sg.Button(">", k="next"),
+            ],
         ]
-        self.window = sg.Window("Base type details", layout=self.layout, finalize=True)
+        self.window = sg.Window(
+            "Base type details",
+            layout=self.layout,
+            finalize=True,
+            enable_close_attempted_event=True,
+        )
         self.window["ignore"].expand(True, True)
         self.window["unignore"].expand(True, True)
+        self.table = None
+        self.page = 0
+        self.closed = False
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.table) // DETAILS_PAGE_SIZE))
+
+    def show(
+        self, index: classes.PriceIndex, basetype, item_level, scanned_level=None
+    ) -> None:
+        table = self.format_prices(prices=index.uniques(basetype))
+        table["levelRequired"] = table["levelRequired"].fillna(0)
+        if item_level and item_level == item_level:
+            table = table.loc[table["levelRequired"] <= int(item_level)]
+        self.table = table[DETAILS_COLUMNS].reset_index(drop=True)
+        self.page = 0
+        self.window.set_title(f"{basetype} details")
+        self.window["ev"].update(self.format_summary(index, basetype, scanned_level))
+        self.show_page()
+        self.window.un_hide()
+        self.main_loop()
+
+    def show_page(self) -> None:
+        start = self.page * DETAILS_PAGE_SIZE
+        rows = self.table.iloc[start : start + DETAILS_PAGE_SIZE].values.tolist()
+        update_table(self.window["table"], rows)
+        self.window["page"].update(f"Page {self.page + 1}/{self.pages}")
 
     def main_loop(self) -> None:
         while True:
             event, values = self.window.read()
 
             if event == sg.WIN_CLOSED:
+                self.closed = True
+                break
+
+            if event == sg.WINDOW_CLOSE_ATTEMPTED_EVENT:
+                self.window.hide()
                 break
 
             if event == "ignore":
-                self.add_items_to_blacklist(self.table, values[0])
+                self.set_blacklisted(values["table"], True)
 
             if event == "unignore":
-                self.remove_items_from_blacklist(self.table, values[0])
+                self.set_blacklisted(values["table"], False)
+
+            if event == "prev" and self.page > 0:
+                self.page -= 1
+                self.show_page()
+
+            if event == "next" and self.page < self.pages - 1:
+                self.page += 1
+                self.show_page()
 
     @staticmethod
-    def format_prices(prices, basetype):
-        prices = prices.loc[prices["baseType"] == basetype]
+    def format_summary(index: classes.PriceIndex, basetype, item_level) -> str:
+        cfg = classes.Config.shared()
+        summary = logic.ev_summary(
+            [{"base": basetype, "Item Level": item_level}], index=index, cfg=cfg
+        )
+        if summary.empty:
+            return ""
+        row = summary.iloc[0]
+        return (
+            f"EV {row['EV']:.1f}c ± {row['EV Std']:.1f}, "
+            f"P(profit over {float(cfg['Prices'].get('GambleCost')):g}c) "
+            f"{row['P(Profit)']:.0%}, "
+            f"P10/P50/P90 {row['P10']:.1f}/{row['P50']:.1f}/{row['P90']:.1f}c"
+        )
+
+    @staticmethod
+    def format_prices(prices):
         prices = prices[
             [
                 "name",
@@ -194,51 +328,71 @@ class ViewDetailsBaseType:
                 "levelRequired",
             ]
         ]
-        prices.rename(
+        return prices.rename(
             columns={
                 "name": "Name",
                 "chaosValue": "Chaos Price",
                 "listingCount": "Listings",
-            },
-            inplace=True,
+            }
         )
-        return prices
 
-    @staticmethod
-    def add_items_to_blacklist(table, indices: list):
-        table = table.iloc[indices]
-        item_list = table["Name"].values
-        classes.Blacklist().add_to_blacklist(item_list)
-
-    @staticmethod
-    def remove_items_from_blacklist(table, indices: list):
-        table = table.iloc[indices]
-        item_list = table["Name"].values
-        classes.Blacklist().remove_from_blacklist(item_list)
+    def set_blacklisted(self, indices: list, blacklisted: bool) -> None:
+        positions = [self.page * DETAILS_PAGE_SIZE + i for i in indices]
+        item_list = self.table.iloc[positions]["Name"].values
+        if blacklisted:
+            classes.Blacklist.shared().add_to_blacklist(item_list)
+        else:
+            classes.Blacklist.shared().remove_from_blacklist(item_list)
+        self.table.loc[positions, "Blacklisted"] = blacklisted
+        self.show_page()
 
 
 class ConfigEditor:
     def __init__(self) -> None:
-        self.config = classes.Config()
-        cfg = self.config.load_config()
-        self.loaded_config = cfg
+        import ev
+
+        self.config = classes.Config.shared()
+        cfg = self.config
         input_fields = {
             "Hotkey": sg.Input(cfg["Base"].get("Hotkey"), size=(10, 1), k="Hotkey"),
+            "HotkeyDebounce": sg.Input(
+                cfg["Base"].get("HotkeyDebounce"), size=(5, 1), k="HotkeyDebounce"
+            ),
             "RefreshPricesOnStart": sg.Combo(
                 ["True", "False"],
                 cfg["Base"].get("RefreshPricesOnStart"),
                 readonly=True,
                 k="RefreshPricesOnStart",
             ),
+            "PriceCacheMinutes": sg.Input(
+                cfg["Base"].get("PriceCacheMinutes"), size=(5, 1), k="PriceCacheMinutes"
+            ),
             "MouseMoveDelay": sg.Input(
                 cfg["Base"].get("MouseMoveDelay"), size=(5, 1), k="MouseMoveDelay"
             ),
+            "ClipboardTimeout": sg.Input(
+                cfg["Base"].get("ClipboardTimeout"), size=(5, 1), k="ClipboardTimeout"
+            ),
+            "SkipEmptyCells": sg.Combo(
+                ["True", "False"],
+                cfg["Base"].get("SkipEmptyCells"),
+                readonly=True,
+                k="SkipEmptyCells",
+            ),
+            "EmptyCellThreshold": sg.Input(
+                cfg["Base"].get("EmptyCellThreshold"),
+                size=(5, 1),
+                k="EmptyCellThreshold",
+            ),
             "Language": sg.Combo(
                 ["EN", "GE", "FR", "RU", "ES"],
                 cfg["Base"].get("Language"),
                 readonly=True,
                 k="Language",
             ),
+            "SnapshotCacheSize": sg.Input(
+                cfg["Base"].get("SnapshotCacheSize"), size=(5, 1), k="SnapshotCacheSize"
+            ),
             "League": sg.Combo(
                 ["Expedition", "Hardcore Expedition", "Standard", "Hardcore"],
                 cfg["Base"].get("League"),
@@ -248,6 +402,23 @@ class ConfigEditor:
             "WindowTitle": sg.Input(
                 cfg["Base"].get("WindowTitle"), size=(25, 1), k="WindowTitle"
             ),
+            "ScanEngine": sg.Combo(
+                ["Python", "Pandas"],
+                cfg["Base"].get("ScanEngine"),
+                readonly=True,
+                k="ScanEngine",
+            ),
+            "ProfileScans": sg.Combo(
+                ["True", "False"],
+                cfg["Base"].get("ProfileScans"),
+                readonly=True,
+                k="ProfileScans",
+            ),
+            "PriceRefreshMinutes": sg.Input(
+                cfg["Base"].get("PriceRefreshMinutes"),
+                size=(5, 1),
+                k="PriceRefreshMinutes",
+            ),
             "UnlinkedOnly": sg.Combo(
                 ["True", "False"],
                 cfg["Prices"].get("UnlinkedOnly"),
@@ -278,11 +449,39 @@ class ConfigEditor:
                 k="MinItemLevelRestriction",
             ),
             "SortBy": sg.Combo(
-                ["Average Chaos", "Expected Chaos"],
+                ["Chaos Average", "Expected Chaos"],
                 cfg["Prices"].get("SortBy"),
                 readonly=True,
                 k="SortBy",
             ),
+            "PriceHistoryHalfLifeHours": sg.Input(
+                cfg["Prices"].get("PriceHistoryHalfLifeHours"),
+                size=(5, 1),
+                k="PriceHistoryHalfLifeHours",
+            ),
+            "ExpectedValue": sg.Combo(
+                ev.EV_MODES,
+                cfg["Prices"].get("ExpectedValue"),
+                readonly=True,
+                k="ExpectedValue",
+            ),
+            "EVWeighting": sg.Combo(
+                ev.EV_WEIGHTINGS,
+                cfg["Prices"].get("EVWeighting"),
+                readonly=True,
+                k="EVWeighting",
+            ),
+            "UniqueChance": sg.Input(
+                cfg["Prices"].get("UniqueChance"), size=(5, 1), k="UniqueChance"
+            ),
+            "GambleCost": sg.Input(
+                cfg["Prices"].get("GambleCost"), size=(5, 1), k="GambleCost"
+            ),
+            "MonteCarloSamples": sg.Input(
+                cfg["Prices"].get("MonteCarloSamples"),
+                size=(7, 1),
+                k="MonteCarloSamples",
+            ),
             "GridTopLeftCornerX": sg.Input(
                 cfg["Screen"].get("GridTopLeftCornerX"),
                 size=(4, 1),
@@ -323,14 +522,12 @@ class ConfigEditor:
                     self.window[k].update(str(int(float(grid_dict[k]))))
                 self.window.refresh()
             if event == "Save":
-                for section in self.loaded_config:
-                    for item in self.loaded_config[section]:
-                        self.loaded_config[section].update({item: values[item]})
-                self.config.save_config(self.loaded_config)
+                self.config.update(values)
                 sg.Popup("Config Saved!")
 
 
 if __name__ == "__main__":
+    logger = set_up_logging()
     try:
         MainWindow().main_loop()
     except Exception:
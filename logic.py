@@ -1,150 +1,638 @@
-import sys
+from __future__ import annotations
 
-import keyboard
-import pandas as pd
-import pyautogui as ag
-import pyperclip
+from queue import Queue
+from threading import Event, Thread
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING
 
+import backends
 import classes
+import metrics
 
-output_dataframe = pd.DataFrame(
-    columns=[
-        "Base",
-        "Item Level",
-        "Items",
-        "Chaos Min",
-        "Chaos Average",
-        "Chaos Max",
-        "Expected Chaos",
-    ],
-    data=[["", "", "", "", "", "", ""]],
-)
-status = False
-refresh = False
-
-if sys.platform == "win32":
-    from win32gui import GetForegroundWindow, GetWindowText
-
-
-def get_items(grid) -> pd.DataFrame:
-    item_list = []
+if TYPE_CHECKING:
+    import pandas as pd
+
+OUTPUT_COLUMNS = [
+    "Base",
+    "Item Level",
+    "Items",
+    "Chaos Min",
+    "Chaos Average",
+    "Chaos Max",
+    "Expected Chaos",
+]
+OUTPUT_DTYPES = {
+    "Items": "int64",
+    "Chaos Min": "float64",
+    "Chaos Average": "float64",
+    "Chaos Max": "float64",
+    "Expected Chaos": "float64",
+}
+PLAN_COLUMNS = ["Base", "Item Level", "Cost", "Expected Chaos", "Profit"]
+STATUS_EVENT = "-STATUS-"
+RESULTS_EVENT = "-RESULTS-"
+METRICS_EVENT = "-METRICS-"
+
+
+class ClipboardCapture:
+    def __init__(
+        self,
+        copy,
+        paste,
+        clear=None,
+        sequence=None,
+        timeout: float = 0.03,
+        poll_interval: float = 0.002,
+        latency_margin: float = 2.0,
+        min_captures: int = 3,
+    ) -> None:
+        self.copy = copy
+        self.paste = paste
+        self.clear = clear
+        self.sequence = sequence
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.latency_margin = latency_margin
+        self.min_captures = min_captures
+        self.captures = 0
+        self.slowest = 0.0
+        self.last_text = None
+
+    def reset(self) -> None:
+        if self.clear is not None:
+            self.clear()
+        self.last_text = self.paste()
+
+    def deadline(self) -> float:
+        if self.captures < self.min_captures:
+            return self.timeout
+        bound = self.slowest * self.latency_margin + self.poll_interval
+        return min(self.timeout, bound)
+
+    def wait_for_change(self, before_sequence, start: float) -> str:
+        deadline = start + self.deadline()
+        while True:
+            if self.sequence is not None:
+                if self.sequence() != before_sequence:
+                    return self.paste()
+            else:
+                text = self.paste()
+                if text != self.last_text:
+                    return text
+            if perf_counter() >= deadline:
+                return None
+            sleep(self.poll_interval)
+
+    def capture(self) -> str:
+        before_sequence = None if self.sequence is None else self.sequence()
+        start = perf_counter()
+        self.copy()
+        text = self.wait_for_change(before_sequence, start)
+        if text is None:
+            return None
+        self.captures += 1
+        self.slowest = max(self.slowest, perf_counter() - start)
+        if text == self.last_text:
+            return None
+        self.last_text = text
+        return text
+
+    @classmethod
+    def from_backend(
+        cls, backend: backends.InputBackend, timeout: float
+    ) -> ClipboardCapture:
+        sequence = None
+        if backend.clipboard_sequence() is not None:
+            sequence = backend.clipboard_sequence
+        return cls(
+            copy=backend.copy,
+            paste=backend.read_clipboard,
+            clear=lambda: backend.write_clipboard(" "),
+            sequence=sequence,
+            timeout=timeout,
+        )
+
+
+def iter_items(
+    grid,
+    backend: backends.InputBackend,
+    capture: ClipboardCapture,
+    cancel=None,
+    scan_metrics: metrics.ScanMetrics = None,
+):
+    if scan_metrics is None:
+        scan_metrics = metrics.ScanMetrics()
+    capture.reset()
     for t in grid:
-        ag.moveTo(t[0], t[1])
-        keyboard.press_and_release("ctrl+c")
+        if cancel is not None and cancel():
+            return
+        scan_metrics.count("hovers")
+        with scan_metrics.stage("move"):
+            backend.move_to(t[0], t[1])
+        with scan_metrics.stage("clipboard"):
+            text = capture.capture()
+        if text is None:
+            scan_metrics.count("empty_cells")
+            continue
         try:
-            item_list.append(classes.Item(pyperclip.paste()).properties)
+            with scan_metrics.stage("parse"):
+                properties = classes.Item(text).properties
         except IndexError:
-            pass
-    items = pd.DataFrame().from_records(item_list)
-    items.drop_duplicates(inplace=True)
-    items = items[["base", "Item Level"]]
-    return items
-
-
-def format_final_df(df) -> pd.DataFrame:
-    new_cols = []
-    for col in df.columns:
-        if isinstance(col, str):
-            new_cols.append(col)
-        else:
-            new_cols.append(f"{col[0]} {col[1]}".strip())
-    df.columns = new_cols
-    df.rename(
-        columns={
-            "base": "Base",
-            "Items sum": "Items",
-            "chaosValue max": "Chaos Max",
-            "chaosValue min": "Chaos Min",
-            "chaosValue mean": "Chaos Average",
-        },
-        inplace=True,
+            scan_metrics.count("parse_failures")
+            continue
+        yield properties
+
+
+def get_items(grid, backend: backends.InputBackend, capture: ClipboardCapture) -> list:
+    return list(iter_items(grid, backend=backend, capture=capture))
+
+
+def scan_grid(
+    trading_window: classes.TradingWindow,
+    backend: backends.InputBackend,
+    cfg: classes.Config,
+) -> list:
+    if cfg["Base"].get("SkipEmptyCells", fallback="False") != "True":
+        return trading_window.get_grid()
+    image = backend.screenshot(trading_window.get_region())
+    return trading_window.get_item_grid(
+        image, threshold=float(cfg["Base"].get("EmptyCellThreshold"))
     )
-    return df[
-        [
-            "Base",
-            "Item Level",
-            "Items",
-            "Chaos Min",
-            "Chaos Average",
-            "Chaos Max",
-            "Expected Chaos",
-        ]
-    ]
+
+
+def items_frame(records: list) -> pd.DataFrame:
+    import pandas as pd
+
+    items = pd.DataFrame.from_records(records, columns=["base", "Item Level"])
+    return items.drop_duplicates()
 
 
 def display_items(
     items: pd.DataFrame,
-    prices: pd.DataFrame,
+    index: classes.PriceIndex,
     cfg: classes.Config,
 ) -> pd.DataFrame:
+    import pandas as pd
 
-    global output_dataframe
     min_chaos = float(cfg["Prices"].get("MinimumMeanChaosValue"))
-    prices["ev_helper"] = prices["chaosValue"] * prices["listingCount"]
-    prices = prices.pivot_table(
-        values=["chaosValue", "Items", "ev_helper", "listingCount"],
-        index="baseType",
-        aggfunc={
-            "chaosValue": ["mean", "min", "max"],
-            "Items": "sum",
-            "ev_helper": "sum",
-            "listingCount": "sum",
-        },
-    )
-    prices["Expected Chaos"] = (
-        prices[("ev_helper", "sum")] / prices[("listingCount", "sum")]
-    )
-    merge = pd.merge(
-        items, prices.reset_index(), left_on="base", right_on="baseType", how="left"
+    items = items.assign(base=items["base"].map(index.canonical))
+    merge = pd.concat(
+        [
+            items.reset_index(drop=True).rename(columns={"base": "Base"}),
+            index.lookup(items["base"]),
+        ],
+        axis=1,
     )
-    merge = merge.loc[merge[("chaosValue", "mean")] >= min_chaos]
-    merge = format_final_df(merge)
+    model = index.ev_model(cfg)
+    if model is not None:
+        merge["Expected Chaos"] = model.expected(
+            merge["Base"], pd.to_numeric(merge["Item Level"], errors="coerce")
+        )
+    merge = merge.loc[merge["Chaos Average"] >= min_chaos]
+    if merge.empty:
+        return rows_frame([])
     sort_by = cfg["Prices"].get("SortBy")
-    merge = merge.sort_values(by=sort_by, ascending=False)
-    output_dataframe = merge[
-        [
-            "Base",
-            "Item Level",
-            "Items",
-            "Chaos Min",
-            "Chaos Average",
-            "Chaos Max",
-            "Expected Chaos",
-        ]
-    ].round({"Chaos Min": 1, "Chaos Average": 1, "Chaos Max": 1, "Expected Chaos": 3})
-
-
-def main(queue) -> None:
-    global status
-    global refresh
-    cfg = classes.Config().load_config()
-    ag.PAUSE = float(cfg["Base"].get("MouseMoveDelay"))
-    lang = cfg["Base"].get("Language", fallback="EN")
-    league = cfg["Base"].get("League")
-
-    if cfg["Base"].get("RefreshPricesOnStart", fallback="True") == "True":
-        classes.Prices().fetch_prices(league=league, language=lang)
-
-    prices = classes.Prices().load_prices()
-    continue_on_key = cfg["Base"].get("Hotkey")
-    grid = classes.TradingWindow().get_grid()
-    pyperclip.copy(" ")
-    status = True
-    while True:
+    merge = merge.sort_values(by=sort_by, ascending=False, kind="mergesort")
+    return (
+        merge[OUTPUT_COLUMNS]
+        .astype(OUTPUT_DTYPES)
+        .round(
+            {"Chaos Min": 1, "Chaos Average": 1, "Chaos Max": 1, "Expected Chaos": 3}
+        )
+        .reset_index(drop=True)
+    )
+
+
+def round_half_even(value: float, decimals: int) -> float:
+    if value != value:
+        return value
+    scale = 10.0 ** decimals
+    return round(value * scale) / scale
+
+
+def sort_key(value) -> tuple:
+    if value != value:
+        return False, 0
+    return True, value
+
+
+class ScanResults:
+    def __init__(
+        self,
+        index: classes.PriceIndex,
+        cfg: classes.Config,
+        scan_metrics: metrics.ScanMetrics = None,
+    ) -> None:
+        self.index = index
+        self.metrics = scan_metrics
+        self.min_chaos = float(cfg["Prices"].get("MinimumMeanChaosValue"))
+        self.sort_by = OUTPUT_COLUMNS.index(cfg["Prices"].get("SortBy"))
+        self.model = index.ev_model(cfg)
+        self.expected = {}
+        self.seen = set()
+        self.records = []
+        self.ranked = []
+
+    def add(self, record: dict) -> bool:
+        self.records.append(record)
+        key = (record["base"], record.get("Item Level"))
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        base = self.index.canonical(record["base"])
+        if record["base"] in self.index.ambiguous:
+            self.report_ambiguous(record["base"])
+        stats = self.index.rows.get(base)
+        if stats is None and self.metrics is not None:
+            self.metrics.count("unmatched_bases")
+        if stats is None or not stats[2] >= self.min_chaos:
+            return False
+        items, chaos_min, chaos_avg, chaos_max, expected = stats
+        level = record.get("Item Level", float("nan"))
+        if self.model is not None:
+            self.prepare([record])
+            expected = self.expected[(base, record.get("Item Level"))]
+        row = (base, level, items, chaos_min, chaos_avg, chaos_max, expected)
+        self.ranked.append(
+            (
+                row[self.sort_by],
+                (
+                    base,
+                    level,
+                    items,
+                    round_half_even(chaos_min, 1),
+                    round_half_even(chaos_avg, 1),
+                    round_half_even(chaos_max, 1),
+                    round_half_even(expected, 3),
+                ),
+            )
+        )
+        return True
+
+    def report_ambiguous(self, name: str) -> None:
+        from loguru import logger
+
+        if self.metrics is not None:
+            self.metrics.count("ambiguous_bases")
+        logger.warning(
+            "Base of {!r} is ambiguous between {}, skipping it",
+            name,
+            ", ".join(self.index.ambiguous[name]),
+        )
+
+    def prepare(self, records: list) -> None:
+        if self.model is None:
+            return
+        keys = {
+            (self.index.canonical(record["base"]), record.get("Item Level"))
+            for record in records
+        }
+        keys = [key for key in keys if key not in self.expected]
+        if not keys:
+            return
+        levels = [float("nan") if level is None else float(level) for _, level in keys]
+        values = self.model.expected([base for base, _ in keys], levels)
+        self.expected.update(zip(keys, values.tolist()))
+
+    def ranked_rows(self) -> list:
+        ranked = sorted(self.ranked, key=lambda entry: sort_key(entry[0]), reverse=True)
+        return [row for _, row in ranked]
+
+
+def rank_items(records: list, index: classes.PriceIndex, cfg: classes.Config) -> list:
+    results = ScanResults(index=index, cfg=cfg)
+    results.prepare(records)
+    for record in records:
+        results.add(record)
+    return results.ranked_rows()
+
+
+def rows_frame(rows: list) -> pd.DataFrame:
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+    return frame if rows else frame.astype(OUTPUT_DTYPES)
+
+
+def plan_purchases(
+    records: list,
+    index: classes.PriceIndex,
+    cfg: classes.Config,
+    budget: int,
+    default_cost: int = 1,
+) -> list:
+    import optimizer
+
+    gamble_cost = float(cfg["Prices"].get("GambleCost") or 0.0)
+    model = index.ev_model(cfg)
+    bases = [index.canonical(record["base"]) for record in records]
+    levels = [float(record.get("Item Level", "nan")) for record in records]
+    if model is not None:
+        expected = list(model.expected(bases, levels))
+    else:
+        expected = [index.rows.get(base, (float("nan"),) * 5)[4] for base in bases]
+    costs = [int(record.get("Cost", default_cost)) for record in records]
+    profits = [value - gamble_cost for value in expected]
+    chosen = optimizer.select(profits, costs, budget)
+    plan = [
+        (
+            bases[i],
+            records[i].get("Item Level", float("nan")),
+            costs[i],
+            round_half_even(expected[i], 3),
+            round_half_even(profits[i], 3),
+        )
+        for i in chosen
+    ]
+    return sorted(plan, key=lambda row: row[4], reverse=True)
+
+
+def ev_summary(
+    records: list, index: classes.PriceIndex, cfg: classes.Config
+) -> pd.DataFrame:
+    mode = cfg["Prices"].get("ExpectedValue")
+    model = index.ev_model(cfg, mode if mode != "Listings" else "Exact")
+    keys = {}
+    for record in records:
+        base = index.canonical(record["base"])
+        if base in index.rows:
+            keys.setdefault((base, record.get("Item Level")), None)
+    bases = [base for base, _ in keys]
+    levels = [float(level or "nan") for _, level in keys]
+    summary = model.summary(bases, levels)
+    summary["Item Level"] = [level for _, level in keys]
+    return summary.round(3)
+
+
+def stream_scan(
+    grid,
+    backend: backends.InputBackend,
+    capture: ClipboardCapture,
+    index: classes.PriceIndex,
+    cfg: classes.Config,
+    publish,
+    cancel=None,
+    scan_metrics: metrics.ScanMetrics = None,
+) -> None:
+    if scan_metrics is None:
+        scan_metrics = metrics.ScanMetrics()
+    results = ScanResults(index=index, cfg=cfg, scan_metrics=scan_metrics)
+    for record in iter_items(
+        grid, backend=backend, capture=capture, cancel=cancel, scan_metrics=scan_metrics
+    ):
+        scan_metrics.count("items")
+        with scan_metrics.stage("rank"):
+            added = results.add(record)
+            if added:
+                frame = rows_frame(results.ranked_rows())
+        if added:
+            publish(RESULTS_EVENT, frame)
+    with scan_metrics.stage("final_rank"):
+        frame = process_scan(records=results.records, index=index, cfg=cfg)
+    scan_metrics.count("rows", len(frame))
+    publish(RESULTS_EVENT, frame)
+
+
+def display_items_fast(
+    records: list, index: classes.PriceIndex, cfg: classes.Config
+) -> pd.DataFrame:
+    return rows_frame(rank_items(records=records, index=index, cfg=cfg))
+
+
+def process_scan(
+    records: list, index: classes.PriceIndex, cfg: classes.Config
+) -> pd.DataFrame:
+    if cfg["Base"].get("ScanEngine", fallback="Python") == "Pandas":
+        return display_items(items=items_frame(records), index=index, cfg=cfg)
+    return display_items_fast(records=records, index=index, cfg=cfg)
+
+
+class PriceRefresher:
+    def __init__(self, on_refresh, refresh_now: bool = False) -> None:
+        self.on_refresh = on_refresh
+        self.refresh_now = refresh_now
+        self.stop_event = Event()
+        self.wake = Event()
+        self.thread = None
+
+    def start(self) -> None:
+        classes.Config.shared().add_listener(self.on_config_change)
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        classes.Config.shared().remove_listener(self.on_config_change)
+        self.stop_event.set()
+        self.wake.set()
+
+    def on_config_change(self, changed: set) -> None:
+        if changed & {"PriceRefreshMinutes", "League", "Language"}:
+            self.wake.set()
+
+    @staticmethod
+    def interval() -> float:
+        cfg = classes.Config.shared()
+        return float(cfg["Base"].get("PriceRefreshMinutes", fallback="0")) * 60
+
+    def run(self) -> None:
+        refresh = self.refresh_now
+        while not self.stop_event.is_set():
+            self.wake.clear()
+            if refresh:
+                self.refresh()
+            interval = self.interval()
+            refresh = not self.wake.wait(interval if interval > 0 else None)
+
+    def refresh(self) -> None:
+        from loguru import logger
+        from requests import RequestException
+
+        cfg = classes.Config.shared()
+        lang = cfg["Base"].get("Language", fallback="EN")
+        league = cfg["Base"].get("League")
+        cache = classes.PriceCache(
+            ttl=float(cfg["Base"].get("PriceCacheMinutes", fallback="60")) * 60
+        )
         try:
-            stop_thread = queue.get(timeout=0.00001)
+            prices = classes.Prices(cache=cache, league=league, language=lang)
+            if not prices.fetch_prices():
+                return
+            index = classes.PriceIndex(prices.load_prices(True))
+        except RequestException:
+            logger.exception("Price refresh failed, using previously saved prices")
+            return
+        classes.SnapshotStore.shared().put(league, lang, index)
+        logger.info("Prices for {} ({}) refreshed", league, lang)
+        self.on_refresh(league, lang, index)
+
+
+class ScanWorker:
+    def __init__(
+        self,
+        publish,
+        backend: backends.InputBackend = None,
+        index: classes.PriceIndex = None,
+    ) -> None:
+        self.publish = publish
+        self.backend = backend
+        self.index = index
+        self.loads_prices = index is None
+        self.requests = Queue()
+        self.stop_event = Event()
+        self.cancel_event = Event()
+        self.scanning = Event()
+        self.last_press = float("-inf")
+        self.debounce = 0.0
+        self.capture = None
+        self.hotkey = None
+        self.refresher = None
+
+    def stop(self) -> None:
+        if self.refresher is not None:
+            self.refresher.stop()
+        self.stop_event.set()
+        self.cancel_event.set()
+        self.requests.put(None)
+
+    def on_hotkey(self) -> None:
+        now = perf_counter()
+        if now - self.last_press < self.debounce:
+            return
+        self.last_press = now
+        if self.scanning.is_set():
+            self.cancel_event.set()
+        else:
+            self.requests.put(True)
+
+    def main(self) -> None:
+        try:
+            self.run()
         except Exception:
-            stop_thread = False
-        if stop_thread:
-            status = False
+            from loguru import logger
+
+            logger.exception("Gambler stopped after an error")
+        finally:
+            self.publish(STATUS_EVENT, False)
+
+    def load_index(self, cfg: classes.Config) -> classes.PriceIndex:
+        return classes.SnapshotStore.shared().get(
+            cfg["Base"].get("League"), cfg["Base"].get("Language", fallback="EN")
+        )
+
+    def on_prices_refreshed(
+        self, league: str, language: str, index: classes.PriceIndex
+    ) -> None:
+        cfg = classes.Config.shared()
+        current = (cfg["Base"].get("League"), cfg["Base"].get("Language").upper())
+        if (league, language.upper()) == current:
+            self.index = index
+
+    @staticmethod
+    def start_profiler(cfg: classes.Config):
+        if cfg["Base"].get("ProfileScans", fallback="False") != "True":
             return None
-        if keyboard.is_pressed(continue_on_key) and sys.platform == "win32":
-            keyboard.release(continue_on_key)
-            if GetWindowText(GetForegroundWindow()) == cfg["Base"].get("WindowTitle"):
-                items = get_items(grid=grid)
-                display_items(items=items, prices=prices, cfg=cfg)
-                refresh = True
-        elif keyboard.keyboard(continue_on_key):
-            items = get_items(grid=grid)
-            display_items(items=items, prices=prices, cfg=cfg)
-            refresh = True
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    @staticmethod
+    def save_profile(profiler) -> None:
+        from os import makedirs
+        from os.path import join
+        from time import time
+
+        from loguru import logger
+
+        profiler.disable()
+        makedirs("profiles", exist_ok=True)
+        path = join("profiles", f"scan_{int(time() * 1000)}.prof")
+        profiler.dump_stats(path)
+        logger.info("Scan profile saved to {}", path)
+
+    def report(self, scan_metrics: metrics.ScanMetrics) -> None:
+        from loguru import logger
+
+        summary = scan_metrics.summary()
+        metrics.MetricsHistory.shared().add(summary)
+        logger.info(
+            "Scan took {:.0f}ms: stages {} counts {}",
+            summary["total_ms"],
+            {name: round(value, 1) for name, value in summary["stages_ms"].items()},
+            summary["counts"],
+        )
+        self.publish(METRICS_EVENT, summary)
+
+    def apply_config(self, cfg: classes.Config) -> None:
+        self.backend.set_move_delay(float(cfg["Base"].get("MouseMoveDelay")))
+        self.debounce = float(cfg["Base"].get("HotkeyDebounce", fallback="0.3"))
+        self.capture.timeout = float(cfg["Base"].get("ClipboardTimeout"))
+        if self.hotkey is not None:
+            self.backend.remove_hotkey(self.hotkey)
+        self.hotkey = self.backend.add_hotkey(cfg["Base"].get("Hotkey"), self.on_hotkey)
+
+    def run(self) -> None:
+        if self.backend is None:
+            self.backend = backends.DesktopBackend()
+        cfg = classes.Config.shared()
+        if self.loads_prices:
+            self.index = self.load_index(cfg)
+            self.refresher = PriceRefresher(
+                self.on_prices_refreshed,
+                refresh_now=cfg["Base"].get("RefreshPricesOnStart") == "True",
+            )
+            self.refresher.start()
+        trading_window = classes.TradingWindow()
+        changed_keys = set()
+        cfg.add_listener(changed_keys.update)
+        self.capture = ClipboardCapture.from_backend(
+            self.backend,
+            timeout=float(cfg["Base"].get("ClipboardTimeout", fallback="0.03")),
+        )
+        self.apply_config(cfg)
+        self.publish(STATUS_EVENT, True)
+        try:
+            while self.requests.get() is not None and not self.stop_event.is_set():
+                if changed_keys:
+                    changed = set(changed_keys)
+                    changed_keys.difference_update(changed)
+                    if changed & set(cfg.screen_defaults):
+                        trading_window.load_geometry()
+                    snapshot_keys = classes.PRICE_LOAD_KEYS | {"League", "Language"}
+                    if changed & snapshot_keys and self.loads_prices:
+                        self.index = self.load_index(cfg)
+                    self.apply_config(cfg)
+                title = self.backend.foreground_window_title()
+                if title is not None and title != cfg["Base"].get("WindowTitle"):
+                    continue
+                self.cancel_event.clear()
+                self.scanning.set()
+                scan_metrics = metrics.ScanMetrics()
+                profiler = self.start_profiler(cfg)
+                try:
+                    with scan_metrics.stage("screenshot"):
+                        grid = scan_grid(trading_window, backend=self.backend, cfg=cfg)
+                    stream_scan(
+                        grid=grid,
+                        backend=self.backend,
+                        capture=self.capture,
+                        index=self.index,
+                        cfg=cfg,
+                        publish=self.publish,
+                        cancel=self.cancel_event.is_set,
+                        scan_metrics=scan_metrics,
+                    )
+                finally:
+                    self.scanning.clear()
+                    if profiler is not None:
+                        self.save_profile(profiler)
+                if self.cancel_event.is_set():
+                    scan_metrics.count("cancelled")
+                self.report(scan_metrics)
+        finally:
+            cfg.remove_listener(changed_keys.update)
+            if self.refresher is not None:
+                self.refresher.stop()
+            if self.hotkey is not None:
+                self.backend.remove_hotkey(self.hotkey)
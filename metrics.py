@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+from collections import Counter, deque
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter, time
+
+HISTOGRAM_BINS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class ScanMetrics:
+    def __init__(self) -> None:
+        self.started = time()
+        self.start = perf_counter()
+        self.timings = Counter()
+        self.counts = Counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += perf_counter() - start
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counts[name] += amount
+
+    def summary(self) -> dict:
+        return {
+            "started": self.started,
+            "total_ms": (perf_counter() - self.start) * 1000,
+            "stages_ms": {name: value * 1000 for name, value in self.timings.items()},
+            "counts": dict(self.counts),
+        }
+
+
+def histogram(values: list) -> dict:
+    bins = Counter()
+    for value in values:
+        for edge in HISTOGRAM_BINS_MS:
+            if value <= edge:
+                bins[f"<={edge}ms"] += 1
+                break
+        else:
+            bins[f">{HISTOGRAM_BINS_MS[-1]}ms"] += 1
+    labels = [f"<={edge}ms" for edge in HISTOGRAM_BINS_MS]
+    labels.append(f">{HISTOGRAM_BINS_MS[-1]}ms")
+    return {label: bins[label] for label in labels if bins[label]}
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class MetricsHistory:
+    _shared = None
+    _shared_lock = Lock()
+
+    def __init__(self, size: int = 200) -> None:
+        self.scans = deque(maxlen=size)
+        self.samples = {}
+        self.size = size
+        self.lock = Lock()
+
+    @classmethod
+    def shared(cls) -> MetricsHistory:
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add(self, summary: dict) -> None:
+        with self.lock:
+            self.scans.append(summary)
+            self.add_sample_locked("total", summary["total_ms"])
+            for name, value in summary["stages_ms"].items():
+                self.add_sample_locked(name, value)
+
+    def add_sample(self, name: str, value_ms: float) -> None:
+        with self.lock:
+            self.add_sample_locked(name, value_ms)
+
+    def add_sample_locked(self, name: str, value_ms: float) -> None:
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.size)
+        self.samples[name].append(value_ms)
+
+    def stats(self) -> dict:
+        with self.lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": percentile(values, 0.5),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": max(values),
+                "histogram": histogram(values),
+            }
+            for name, values in samples.items()
+            if values
+        }
+
+    def report(self) -> str:
+        lines = []
+        for name, stats in self.stats().items():
+            lines.append(
+                f"{name}: n={stats['count']} mean={stats['mean_ms']:.1f}ms "
+                f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms "
+                f"max={stats['max_ms']:.1f}ms"
+            )
+            for label, count in stats["histogram"].items():
+                lines.append(f"  {label:>9} {'#' * count}")
+        with self.lock:
+            last = self.scans[-1] if self.scans else None
+        if last is not None:
+            counts = ", ".join(f"{k}={v}" for k, v in sorted(last["counts"].items()))
+            lines.append(f"last scan: {counts}")
+        return "\n".join(lines) if lines else "No scans yet"
+
+    def export(self, path: str) -> None:
+        with self.lock:
+            scans = list(self.scans)
+        with open(path, "w") as f:
+            json.dump({"scans": scans, "stages": self.stats()}, f, indent=2)
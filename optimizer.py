@@ -0,0 +1,60 @@
+import numpy as np
+
+MAX_DP_CELLS = 20_000_000
+
+
+def candidates(values: np.ndarray, costs: np.ndarray, budget: int) -> tuple:
+    useful = np.flatnonzero((values > 0) & (costs <= budget))
+    free = useful[costs[useful] <= 0]
+    paid = useful[costs[useful] > 0]
+    return free, paid
+
+
+def solve_exact(values, costs, budget: int) -> list:
+    values = np.asarray(values, dtype="float64")
+    costs = np.asarray(costs, dtype=int)
+    budget = int(budget)
+    free, paid = candidates(values, costs, budget)
+    best = np.zeros(budget + 1)
+    take = np.zeros((len(paid), budget + 1), dtype=bool)
+    for row, item in enumerate(paid):
+        cost = costs[item]
+        candidate = best[: budget + 1 - cost] + values[item]
+        better = candidate > best[cost:]
+        take[row, cost:] = better
+        best[cost:] = np.where(better, candidate, best[cost:])
+    chosen = list(free)
+    capacity = budget
+    for row in range(len(paid) - 1, -1, -1):
+        if take[row, capacity]:
+            chosen.append(paid[row])
+            capacity -= costs[paid[row]]
+    return sorted(int(item) for item in chosen)
+
+
+def solve_greedy(values, costs, budget: int) -> list:
+    values = np.asarray(values, dtype="float64")
+    costs = np.asarray(costs, dtype=int)
+    budget = int(budget)
+    free, paid = candidates(values, costs, budget)
+    order = paid[np.argsort(-values[paid] / costs[paid], kind="mergesort")]
+    chosen = []
+    spent = 0
+    for item in order:
+        if spent + costs[item] <= budget:
+            chosen.append(item)
+            spent += costs[item]
+    if len(paid):
+        single = paid[np.argmax(values[paid])]
+        if values[single] > values[chosen].sum():
+            chosen = [single]
+    return sorted(int(item) for item in list(free) + chosen)
+
+
+def select(values, costs, budget: int, max_cells: int = MAX_DP_CELLS) -> list:
+    values = np.asarray(values, dtype="float64")
+    costs = np.asarray(costs, dtype=int)
+    _, paid = candidates(values, costs, int(budget))
+    if len(paid) * (int(budget) + 1) <= max_cells:
+        return solve_exact(values, costs, budget)
+    return solve_greedy(values, costs, budget)